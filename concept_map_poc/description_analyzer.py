@@ -7,31 +7,47 @@ and extracts key concepts directly from the user's description.
 
 import re
 import math
+import functools
 from typing import Dict, List, Any, Tuple
 
+# Precompiled tokenizers for analyze_description_complexity
+_WORD_RE = re.compile(r'\b\w+\b')
+# One match per non-blank run of text between sentence terminators
+_SENTENCE_RE = re.compile(r'[^.!?\s][^.!?]*')
+
 
 def analyze_description_complexity(description: str) -> Dict[str, Any]:
     """
     Analyze description text and determine optimal concept map complexity
     Uses logarithmic scaling to prevent exponential growth
     
+    Cached per description, so re-running the same text skips re-tokenizing it.
+    Returns a fresh copy each time because adjust_complexity_for_educational_level
+    updates the complexity dict in place.
+    
     Args:
         description (str): The user's description text (1 word to 3000+ words)
         
     Returns:
         Dict containing analysis results and complexity configuration
     """
+    analysis = _analyze_description_complexity(description)
+    return {**analysis, "complexity": dict(analysis["complexity"])}
+
+
+@functools.lru_cache(maxsize=512)
+def _analyze_description_complexity(description: str) -> Dict[str, Any]:
+    """Uncached analysis behind analyze_description_complexity (do not mutate the result)"""
     
     # Clean and count words
-    words = re.findall(r'\b\w+\b', description.lower())
+    words = _WORD_RE.findall(description.lower())
     word_count = len(words)
     
     # Calculate unique words for additional insight
     unique_words = len(set(words))
     
-    # Estimate sentence complexity
-    sentences = re.split(r'[.!?]+', description)
-    sentence_count = len([s for s in sentences if s.strip()])
+    # Estimate sentence complexity - counted without building the split list
+    sentence_count = sum(1 for _ in _SENTENCE_RE.finditer(description))
     avg_words_per_sentence = word_count / max(sentence_count, 1)
     
     # Logarithmic scaling for concept map complexity - REDUCED TO HALF
@@ -100,10 +116,13 @@ def analyze_description_complexity(description: str) -> Dict[str, Any]:
     }
 
 
+@functools.lru_cache(maxsize=128)
 def extract_topic_name_from_description(description: str) -> str:
     """
     Auto-extract a topic name from the description if not provided
     
+    Cached per description, so regenerating a map from the same text reuses the name.
+    
     Args:
         description (str): The user's description text
         
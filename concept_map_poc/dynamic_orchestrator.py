@@ -48,7 +48,9 @@ def run_dynamic_mode(
     logger.info("📋 Step 1: Creating timeline (analyzing full description)...")
     try:
         timeline = create_timeline(description, educational_level, topic_name)
-        print_timeline_summary(timeline)
+        # Summary walks every sentence/concept - skip it entirely in quiet (WARNING+) runs
+        if logger.isEnabledFor(logging.INFO):
+            print_timeline_summary(timeline)
     except Exception as e:
         logger.error(f"❌ Failed to create timeline: {e}")
         return False
@@ -82,18 +84,15 @@ def run_dynamic_mode(
     # Step 4: Create Streamlit runner script
     streamlit_script = _create_streamlit_runner_script()
     
-    # Step 5: Print instructions and launch Streamlit
-    print("\n" + "=" * 70)
-    print("🌐 DYNAMIC CONCEPT MAP READY")
-    print("=" * 70)
-    print("\n📍 Streamlit server will start shortly...")
-    print("\n🔗 Open this URL in your browser:")
-    print("   http://localhost:8501")
-    print("\n⚠️  IMPORTANT: Keep this terminal window open while viewing")
-    print("\n🛑 TO EXIT AFTER VIEWING:")
-    print("   1. Close the browser tab")
-    print("   2. Press Ctrl+C in this terminal")
-    print("\n" + "=" * 70 + "\n")
+    # Step 5: Log instructions and launch Streamlit
+    logger.info("=" * 70)
+    logger.info("🌐 DYNAMIC CONCEPT MAP READY")
+    logger.info("=" * 70)
+    logger.info("📍 Streamlit server will start shortly...")
+    logger.info("🔗 Open this URL in your browser: http://localhost:8501")
+    logger.info("⚠️  IMPORTANT: Keep this terminal window open while viewing")
+    logger.info("🛑 TO EXIT AFTER VIEWING: close the browser tab, then press Ctrl+C in this terminal")
+    logger.info("=" * 70)
     
     # Launch Streamlit app
     logger.info("🎬 Launching Streamlit app...")
@@ -107,10 +106,9 @@ def run_dynamic_mode(
         logger.error(f"❌ Streamlit failed to run: {e}")
         return False
     except KeyboardInterrupt:
-        print("\n" + "=" * 70)
-        print("✅ DYNAMIC CONCEPT MAP SESSION ENDED")
-        print("=" * 70)
+        logger.info("=" * 70)
         logger.info("✅ Dynamic concept map session ended by user")
+        logger.info("=" * 70)
         return True
 
 
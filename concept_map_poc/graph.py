@@ -5,16 +5,12 @@ This module defines the LangGraph workflow for the description-based concept map
 that extracts concepts directly from user descriptions (1 word to 3000+ words).
 """
 
+import asyncio
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
 from langgraph.graph import StateGraph, END
-from concept_map_poc.states import ConceptMapState
-from concept_map_poc.nodes import (
-    extract_concepts_from_description,
-    analyze_concept_relationships,
-    build_concept_hierarchy,
-    enrich_with_educational_metadata,
-    initialize_legacy_fields,
-    extract_all_in_one_call  # NEW: Combined node
-)
+from concept_map_poc.states import ConceptMapState, CONCEPT_MAP_SECTIONS
+from concept_map_poc.nodes import initialize_legacy_fields, extract_all_in_one_call
 
 
 def create_description_based_concept_map_graph():
@@ -22,10 +18,12 @@ def create_description_based_concept_map_graph():
     Create the LangGraph workflow for description-based concept mapping
     
     ULTRA-OPTIMIZED 1-Node Workflow:
-    1. Combined Extraction → Extract concepts, relationships, AND hierarchy in ONE LLM call
+    1. Combined Extraction → Extract concepts, relationships, hierarchy AND educational
+       metadata in ONE LLM call
     
     Previous optimizations:
-    - Removed educational enrichment (Node 4) - saved 77s & 2717 tokens
+    - Folded educational enrichment (Node 4) into the combined call with a compact schema
+      instead of a separate 2717-token call
     - Combined 3 nodes into 1 - saves ~60s additional
     
     Expected performance:
@@ -52,6 +50,42 @@ def create_description_based_concept_map_graph():
     return workflow.compile()
 
 
+async def batch_build_concept_maps(descriptions: List[str], educational_level: str = "high school",
+                                   max_concurrency: int = 4,
+                                   requested_fields: Optional[Iterable[str]] = None) -> List[Dict]:
+    """
+    Run the workflow over several descriptions concurrently
+    
+    The nodes are async, so while one description waits on Gemini the others
+    make progress; a semaphore caps how many requests are in flight at once.
+    
+    Args:
+        descriptions: Description texts to map
+        educational_level: Target educational level for every description
+        max_concurrency: Maximum number of workflows running at the same time
+        requested_fields: Sections to generate, e.g. {"concepts", "hierarchy"}
+            (default: all of CONCEPT_MAP_SECTIONS); skipping unused sections
+            shortens the model output
+        
+    Returns:
+        List of final states, in the same order as descriptions
+    """
+    sections = frozenset(requested_fields) if requested_fields is not None else CONCEPT_MAP_SECTIONS
+    workflow = create_description_based_concept_map_graph()
+    semaphore = asyncio.Semaphore(max_concurrency)
+    
+    async def run_one(description: str) -> Dict:
+        async with semaphore:
+            return await workflow.ainvoke(ConceptMapState(
+                description=description,
+                educational_level=educational_level,
+                requested_fields=sections,
+                timestamp=datetime.now().isoformat()
+            ))
+    
+    return await asyncio.gather(*(run_one(description) for description in descriptions))
+
+
 # Legacy function for backward compatibility
 def create_universal_concept_map_graph():
     """Legacy function - redirects to new description-based approach"""
@@ -63,7 +97,7 @@ def print_description_based_workflow_summary():
     Print a summary of the description-based workflow
     """
     print("🔄 ULTRA-OPTIMIZED 1-Node Concept Map Workflow:")
-    print("   � Combined Extraction - Extract concepts, relationships, AND hierarchy in ONE call")
+    print("   � Combined Extraction - Extract concepts, relationships, hierarchy AND metadata in ONE call")
     print("   ⚡ Expected: 60-80s (vs 141s with 3 nodes = 50% faster!)")
     print()
 
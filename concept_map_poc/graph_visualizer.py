@@ -3,23 +3,228 @@ Graph Visualizer for Concept Maps
 Generates visual representations of concept maps using NetworkX and Matplotlib
 """
 
+import io
+import os
+import sys
 import json
+import functools
+import hashlib
 import logging
+import numpy as np
 import networkx as nx
-import matplotlib.pyplot as plt
+import matplotlib
+matplotlib.use('Agg')  # Non-interactive backend - we only ever write image files
 import matplotlib.patches as patches
-from datetime import datetime
+from matplotlib.lines import Line2D
+from matplotlib.collections import LineCollection
+from matplotlib.colors import to_rgba_array
+from matplotlib.figure import Figure
 from pathlib import Path
-from typing import Dict, List, Tuple, Any
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple, Any
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import ijson
+    IJSON_AVAILABLE = True
+except ImportError:
+    IJSON_AVAILABLE = False
+
+try:
+    import numba
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+# Files at least this large are streamed with ijson instead of parsed whole
+STREAMING_THRESHOLD_BYTES = 8 * 1024 * 1024
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
 
+def _layout_positions_loop(level_sizes: np.ndarray, level_height: float, x_spacing: float) -> np.ndarray:
+    """
+    Hierarchical layout coordinates as a plain nested loop (compiled with Numba)
+    
+    Args:
+        level_sizes: Number of concepts per hierarchy level, top level first
+        level_height: Vertical distance between levels
+        x_spacing: Horizontal distance between concepts on a level
+        
+    Returns:
+        np.ndarray: (sum(level_sizes), 2) positions, level by level
+    """
+    num_levels = level_sizes.shape[0]
+    out = np.empty((level_sizes.sum(), 2), dtype=np.float64)
+    row = 0
+    for level_idx in range(num_levels):
+        n = level_sizes[level_idx]
+        # Distribute concepts horizontally, centred on x = 0
+        x0 = -(n - 1) * x_spacing / 2
+        y = (num_levels - level_idx - 1) * level_height
+        for j in range(n):
+            out[row, 0] = x0 + j * x_spacing
+            out[row, 1] = y
+            row += 1
+    return out
+
+
+def _layout_positions_numpy(level_sizes: np.ndarray, level_height: float, x_spacing: float) -> np.ndarray:
+    """Vectorized equivalent of _layout_positions_loop, used when Numba is not installed"""
+    num_levels = len(level_sizes)
+    row_level = np.repeat(np.arange(num_levels), level_sizes)
+    level_start = np.cumsum(level_sizes) - level_sizes
+    slot = np.arange(len(row_level)) - level_start[row_level]
+    xs = slot * x_spacing - (level_sizes[row_level] - 1) * x_spacing / 2
+    ys = (num_levels - row_level - 1) * level_height
+    return np.column_stack([xs, ys]).astype(np.float64)
+
+
+if NUMBA_AVAILABLE:
+    # No cache=True: Numba's on-disk cache is keyed on the importing module name, so
+    # a cache built as graph_visualizer breaks concept_map_poc.graph_visualizer (and
+    # vice versa); the compile is small and happens once per process
+    _layout_positions = numba.njit(_layout_positions_loop)
+else:
+    _layout_positions = _layout_positions_numpy
+
+
+def _atomic_write(path: str, payload) -> None:
+    """
+    Write bytes to a temporary file beside path, then os.replace it into place
+    
+    Args:
+        path: Destination file path
+        payload: Bytes-like object to write
+    """
+    tmp_path = f"{path}.{os.getpid()}.tmp"  # Per-process, so parallel renders never share one
+    view = memoryview(payload)
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        while view:
+            view = view[os.write(fd, view):]
+    finally:
+        os.close(fd)
+    os.replace(tmp_path, path)
+
+
+def _intern_endpoints(relationships: List[Dict[str, Any]]) -> None:
+    """
+    Intern relationship endpoint names in place
+    
+    Concept names then share one string object across the concepts dict,
+    relationships, graph nodes and level index, and compare by identity.
+    """
+    for relationship in relationships:
+        for key in ('from_concept', 'to_concept'):
+            name = relationship.get(key)
+            if isinstance(name, str):
+                relationship[key] = sys.intern(name)
+
+
+def _normalize_sections(data: Dict[str, Any]) -> Tuple[Dict[str, Any], List[Dict[str, Any]], Dict[str, Any]]:
+    """
+    Pull (concepts, relationships, hierarchy) out of saved results or a workflow state
+    
+    Args:
+        data: Mapping with extracted_concepts / concept_relationships / concept_hierarchy
+        
+    Returns:
+        tuple: (concepts dict, relationships list, hierarchy dict)
+    """
+    # Extract concepts - handle both list and dict formats
+    concepts_data = data.get('extracted_concepts', [])
+    if isinstance(concepts_data, list):
+        # Convert list format to dict format
+        concepts = {sys.intern(concept['name']): concept for concept in concepts_data}
+    else:
+        concepts = {sys.intern(name): concept for name, concept in concepts_data.items()}
+    
+    # Extract relationships
+    relationships = data.get('concept_relationships', [])
+    _intern_endpoints(relationships)
+    
+    # Extract hierarchy - handle both list and dict formats
+    hierarchy_data = data.get('concept_hierarchy', [])
+    if isinstance(hierarchy_data, list):
+        # Convert list format to dict format
+        hierarchy = {'levels': hierarchy_data}
+    else:
+        hierarchy = hierarchy_data
+    
+    return concepts, relationships, hierarchy
+
+
+@functools.lru_cache(maxsize=16)
+def _load_raw(path: str, mtime_ns: int, size: int) -> Tuple[Dict[str, Any], List[Dict[str, Any]], Dict[str, Any]]:
+    """
+    Parse a concept map JSON file into (concepts, relationships, hierarchy)
+    
+    Cached by (path, mtime_ns, size), so an unchanged file is only parsed once.
+    The returned containers are shared between callers and must not be mutated.
+    
+    Args:
+        path: Absolute path to the JSON file
+        mtime_ns: File modification time in nanoseconds (cache key only)
+        size: File size in bytes
+        
+    Returns:
+        tuple: (concepts dict, relationships list, hierarchy dict)
+    """
+    if IJSON_AVAILABLE and size >= STREAMING_THRESHOLD_BYTES:
+        # Large export: stream only the three sections we need
+        with open(path, 'rb', buffering=65536) as f:
+            return ConceptMapVisualizer._stream_sections(f)
+    
+    # Read raw bytes through a 64KB buffer; orjson parses bytes directly
+    with open(path, 'rb', buffering=65536) as f:
+        raw = f.read()
+    data = orjson.loads(raw) if ORJSON_AVAILABLE else json.loads(raw)
+    
+    return _normalize_sections(data)
+
+
 class ConceptMapVisualizer:
     """Visualizes concept maps as hierarchical graphs using NetworkX and Matplotlib"""
     
+    # Fixed attribute set - no per-instance __dict__
+    __slots__ = (
+        'graph', 'concepts', 'relationships', 'hierarchy',
+        '_level_names', '_concept_level', '_fig', '_ax',
+        '_node_names', '_node_type_ids', '_node_importance_ids', '_node_levels',
+        '_edge_src', '_edge_dst', '_edge_rel_ids', '_relationship_vocab',
+    )
+    
+    # Define colors and styles
+    NODE_COLORS = {
+        'fundamental': '#FF6B6B',  # Red
+        'principle': '#4ECDC4',     # Teal
+        'process': '#45B7D1',       # Blue
+        'application': '#96CEB4',   # Green
+        'concept': '#FECA57'        # Yellow (default)
+    }
+    
+    EDGE_COLORS = {
+        'strong': '#2C3E50',        # Dark blue
+        'medium': '#7F8C8D',        # Gray
+        'weak': '#BDC3C7'           # Light gray
+    }
+    
+    # Vocabularies for the integer-coded node attributes
+    CONCEPT_TYPES = tuple(NODE_COLORS)
+    IMPORTANCE_LEVELS = ('high', 'medium', 'low')
+    
+    # Lookup tables indexed by the type / importance ids
+    _COLOR_LUT = to_rgba_array(list(NODE_COLORS.values()))
+    _SIZE_LUT = np.array([3000, 2000, 1500])  # high, medium, low
+    
     def __init__(self):
         """Initialize the visualizer"""
         logger.info("ConceptMapVisualizer initialized")
@@ -27,6 +232,19 @@ class ConceptMapVisualizer:
         self.concepts = {}
         self.relationships = []
         self.hierarchy = {}
+        self._level_names = []     # Concept names per hierarchy level
+        self._concept_level = {}   # Concept name -> hierarchy level index
+        self._fig = None           # Figure/Axes reused across generate_graph_image calls
+        self._ax = None
+        # Read-only graph data as parallel arrays (struct of arrays), built by extract_graph_data
+        self._node_names = []
+        self._node_type_ids = np.empty(0, dtype=np.int8)
+        self._node_importance_ids = np.empty(0, dtype=np.int8)
+        self._node_levels = np.empty(0, dtype=np.int32)
+        self._edge_src = np.empty(0, dtype=np.int32)
+        self._edge_dst = np.empty(0, dtype=np.int32)
+        self._edge_rel_ids = np.empty(0, dtype=np.int32)
+        self._relationship_vocab = []
         
     def load_from_json(self, json_file_path: str) -> bool:
         """
@@ -39,40 +257,86 @@ class ConceptMapVisualizer:
             bool: True if loaded successfully, False otherwise
         """
         try:
-            logger.info(f"Loading concept map from: {json_file_path}")
+            logger.info("Loading concept map from: %s", json_file_path)
             
-            with open(json_file_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            # Parsed sections are cached per file version, so repeat loads skip the parse
+            st = os.stat(json_file_path)
+            self.concepts, self.relationships, self.hierarchy = _load_raw(
+                os.path.abspath(json_file_path), st.st_mtime_ns, st.st_size
+            )
             
-            # Extract concepts - handle both list and dict formats
-            concepts_data = data.get('extracted_concepts', [])
-            if isinstance(concepts_data, list):
-                # Convert list format to dict format
-                self.concepts = {concept['name']: concept for concept in concepts_data}
-            else:
-                self.concepts = concepts_data
-            logger.info(f"Extracted {len(self.concepts)} concepts")
+            logger.info("Extracted %d concepts", len(self.concepts))
+            logger.info("Extracted %d relationships", len(self.relationships))
+            hierarchy_levels = len(self.hierarchy.get('levels', []))
+            logger.info("Extracted %d hierarchy levels", hierarchy_levels)
             
-            # Extract relationships
-            self.relationships = data.get('concept_relationships', [])
-            logger.info(f"Extracted {len(self.relationships)} relationships")
+            self._build_level_index()
+            return True
             
-            # Extract hierarchy - handle both list and dict formats
-            hierarchy_data = data.get('concept_hierarchy', [])
-            if isinstance(hierarchy_data, list):
-                # Convert list format to dict format
-                self.hierarchy = {'levels': hierarchy_data}
-            else:
-                self.hierarchy = hierarchy_data
-            hierarchy_levels = len(self.hierarchy.get('levels', []))
-            logger.info(f"Extracted {hierarchy_levels} hierarchy levels")
+        except Exception as e:
+            logger.error("Error loading JSON file: %s", e)
+            return False
+    
+    def load_from_state(self, data: Dict[str, Any]) -> bool:
+        """
+        Load concept map data straight from an in-memory workflow state or results dict
+        
+        Args:
+            data: Final workflow state, or the dict save_results() writes
+            
+        Returns:
+            bool: True if loaded successfully, False otherwise
+        """
+        try:
+            self.concepts, self.relationships, self.hierarchy = _normalize_sections(data)
+            
+            logger.info("Extracted %d concepts", len(self.concepts))
+            logger.info("Extracted %d relationships", len(self.relationships))
+            logger.info("Extracted %d hierarchy levels", len(self.hierarchy.get('levels', [])))
             
+            self._build_level_index()
             return True
             
         except Exception as e:
-            logger.error(f"Error loading JSON file: {e}")
+            logger.error("Error loading concept map data: %s", e)
             return False
     
+    @staticmethod
+    def _stream_sections(f) -> Tuple[Dict[str, Any], List[Dict[str, Any]], Dict[str, Any]]:
+        """
+        Stream concepts, relationships and hierarchy levels out of an open JSON file
+        
+        Items are inserted straight into the destination containers, so the full
+        document (descriptions, enrichment, logs) is never held in memory.
+        
+        Args:
+            f: JSON file opened in binary mode
+            
+        Returns:
+            tuple: (concepts dict, relationships list, hierarchy dict)
+        """
+        # Concepts - list format first, then dict format
+        concepts = {}
+        for concept in ijson.items(f, 'extracted_concepts.item', use_float=True):
+            concepts[sys.intern(concept['name'])] = concept
+        if not concepts:
+            f.seek(0)
+            for name, concept in ijson.kvitems(f, 'extracted_concepts', use_float=True):
+                concepts[sys.intern(name)] = concept
+        
+        f.seek(0)
+        relationships = list(ijson.items(f, 'concept_relationships.item', use_float=True))
+        _intern_endpoints(relationships)
+        
+        # Hierarchy - list format first, then {'levels': [...]} format
+        f.seek(0)
+        levels = list(ijson.items(f, 'concept_hierarchy.item', use_float=True))
+        if not levels:
+            f.seek(0)
+            levels = list(ijson.items(f, 'concept_hierarchy.levels.item', use_float=True))
+        
+        return concepts, relationships, {'levels': levels}
+    
     def extract_graph_data(self) -> Dict[str, Any]:
         """
         Extract and process graph data for visualization
@@ -80,63 +344,87 @@ class ConceptMapVisualizer:
         Returns:
             dict: Graph statistics and processed data
         """
-        # Create NetworkX graph
-        self.graph.clear()
+        type_ids = {name: i for i, name in enumerate(self.CONCEPT_TYPES)}
+        importance_ids = {name: i for i, name in enumerate(self.IMPORTANCE_LEVELS)}
+        default_type_id = type_ids['concept']
+        default_importance_id = importance_ids['low']
         
-        # Add concept nodes
-        for concept_name, concept_data in self.concepts.items():
-            self.graph.add_node(
-                concept_name,
-                type=concept_data.get('type', 'concept'),
-                importance=concept_data.get('importance', 'medium'),
-                definition=concept_data.get('definition', ''),
-                level=self._get_concept_level(concept_name)
-            )
+        # Unique types in first-seen order, collected while building the graph.
+        # Relationship types double as the vocabulary for edge_rel_ids.
+        concept_types = {}
+        relationship_types = {}
+        
+        # Node arrays
+        num_nodes = len(self.concepts)
+        node_names = list(self.concepts)
+        node_index = {name: i for i, name in enumerate(node_names)}
+        node_type_ids = np.empty(num_nodes, dtype=np.int8)
+        node_importance_ids = np.empty(num_nodes, dtype=np.int8)
+        for i, concept_data in enumerate(self.concepts.values()):
+            concept_type = concept_data.get('type', 'concept')
+            concept_types[concept_type] = None
+            node_type_ids[i] = type_ids.get(concept_type, default_type_id)
+            node_importance_ids[i] = importance_ids.get(concept_data.get('importance', 'medium'), default_importance_id)
+        node_levels = np.fromiter(
+            (self._get_concept_level(name) for name in node_names), dtype=np.int32, count=num_nodes
+        )
         
-        # Add relationship edges
+        # Edge arrays - a repeated (source, target) pair keeps its first position
+        # and its last relationship type, matching DiGraph.add_edge semantics
+        edges = {}
+        lookup_node = node_index.get
         for relationship in self.relationships:
-            source = relationship.get('from_concept', '')
-            target = relationship.get('to_concept', '')
-            rel_type = relationship.get('relationship_type', 'related')
-            strength = relationship.get('strength', 'medium')
+            rget = relationship.get
+            # Every relationship type is recorded for the stats, even on dropped edges
+            rel_id = relationship_types.setdefault(rget('relationship_type', 'related'), len(relationship_types))
             
-            if source in self.concepts and target in self.concepts:
-                self.graph.add_edge(
-                    source,
-                    target,
-                    relationship=rel_type,
-                    strength=strength,
-                    description=relationship.get('description', '')
-                )
+            # One lookup per endpoint doubles as the membership test; stop at a missing source
+            source_idx = lookup_node(rget('from_concept', ''))
+            if source_idx is None:
+                continue
+            target_idx = lookup_node(rget('to_concept', ''))
+            if target_idx is not None:
+                edges[(source_idx, target_idx)] = rel_id
         
-        logger.info(f"Created NetworkX graph with {self.graph.number_of_nodes()} nodes and {self.graph.number_of_edges()} edges")
+        num_edges = len(edges)
+        edge_pairs = np.array(list(edges), dtype=np.int32).reshape(num_edges, 2)
         
-        # Gather statistics
-        concept_types = list(set(data.get('type', 'concept') for data in self.concepts.values()))
-        relationship_types = list(set(rel.get('relationship_type', 'related') for rel in self.relationships))
+        self._node_names = node_names
+        self._node_type_ids = node_type_ids
+        self._node_importance_ids = node_importance_ids
+        self._node_levels = node_levels
+        self._edge_src = edge_pairs[:, 0]
+        self._edge_dst = edge_pairs[:, 1]
+        self._edge_rel_ids = np.fromiter(edges.values(), dtype=np.int32, count=num_edges)
+        self._relationship_vocab = list(relationship_types)
+        
+        # Attribute-free DiGraph view of the arrays, used only for layout and drawing
+        self.graph.clear()
+        self.graph.add_nodes_from(node_names)
+        self.graph.add_edges_from((node_names[u], node_names[v]) for u, v in edges)
+        
+        logger.info("Created NetworkX graph with %d nodes and %d edges", self.graph.number_of_nodes(), self.graph.number_of_edges())
         
         stats = {
             'num_concepts': len(self.concepts),
             'num_relationships': len(self.relationships),
             'num_hierarchy_levels': len(self.hierarchy.get('levels', [])),
-            'concept_types': concept_types,
-            'relationship_types': relationship_types
+            'concept_types': list(concept_types),
+            'relationship_types': list(relationship_types)
         }
         
         return stats
     
-    def _get_concept_level(self, concept_name: str) -> int:
+    def _build_level_index(self):
         """
-        Get the hierarchy level of a concept
+        Walk the hierarchy once and index which level each concept belongs to
         
-        Args:
-            concept_name: Name of the concept
-            
-        Returns:
-            int: Hierarchy level (0-based)
+        Populates self._level_names (names per level) and self._concept_level
+        (name -> first level it appears in).
         """
-        levels = self.hierarchy.get('levels', [])
-        for i, level in enumerate(levels):
+        self._level_names = []
+        self._concept_level = {}
+        for i, level in enumerate(self.hierarchy.get('levels', [])):
             # Handle both dict and list formats for level concepts
             if isinstance(level, dict):
                 concepts_in_level = level.get('concepts', [])
@@ -151,9 +439,21 @@ class ConceptMapVisualizer:
                 # If level is a list, assume it contains concept names directly
                 concept_names = level if isinstance(level, list) else []
             
-            if concept_name in concept_names:
-                return i
-        return 0  # Default to level 0 if not found
+            self._level_names.append(concept_names)
+            for name in concept_names:
+                self._concept_level.setdefault(name, i)
+    
+    def _get_concept_level(self, concept_name: str) -> int:
+        """
+        Get the hierarchy level of a concept
+        
+        Args:
+            concept_name: Name of the concept
+            
+        Returns:
+            int: Hierarchy level (0-based), 0 if not found
+        """
+        return self._concept_level.get(concept_name, 0)
     
     def create_hierarchical_layout(self) -> Dict[str, Tuple[float, float]]:
         """
@@ -163,43 +463,22 @@ class ConceptMapVisualizer:
             dict: Node positions {node_name: (x, y)}
         """
         pos = {}
-        levels = self.hierarchy.get('levels', [])
+        self._build_level_index()
+        levels = self._level_names
         
         if not levels:
             # Fallback to spring layout if no hierarchy
             logger.info("No hierarchy found, using spring layout")
             return nx.spring_layout(self.graph, k=3, iterations=50)
         
-        logger.info(f"Created hierarchical layout for {len(self.concepts)} nodes")
+        logger.info("Created hierarchical layout for %d nodes", len(self.concepts))
         
-        # Calculate positions based on hierarchy levels
-        level_height = 2.0
-        for level_idx, level in enumerate(levels):
-            # Handle both dict and list formats for level concepts
-            if isinstance(level, dict):
-                concepts_in_level = level.get('concepts', [])
-                # Extract concept names from concept objects
-                concept_names = []
-                for concept in concepts_in_level:
-                    if isinstance(concept, dict):
-                        concept_names.append(concept.get('name', ''))
-                    else:
-                        concept_names.append(str(concept))
-            else:
-                # If level is a list, assume it contains concept names directly
-                concept_names = level if isinstance(level, list) else []
-                
-            y_position = (len(levels) - level_idx - 1) * level_height
-            
-            # Distribute concepts horizontally within the level
-            if concept_names:
-                x_spacing = 4.0 if len(concept_names) > 1 else 0
-                start_x = -(len(concept_names) - 1) * x_spacing / 2
-                
-                for i, concept in enumerate(concept_names):
-                    if concept in self.graph.nodes():
-                        x_position = start_x + i * x_spacing
-                        pos[concept] = (x_position, y_position)
+        # Calculate positions based on hierarchy levels in one compiled/vectorized pass
+        level_sizes = np.fromiter((len(names) for names in levels), dtype=np.int64, count=len(levels))
+        coords = _layout_positions(level_sizes, 2.0, 4.0).tolist()
+        names = [name for concept_names in levels for name in concept_names]
+        # Later levels win for concepts listed twice, as before
+        pos.update((name, tuple(xy)) for name, xy in zip(names, coords) if name in self.graph)
         
         # Handle any concepts not in hierarchy levels
         for node in self.graph.nodes():
@@ -208,142 +487,233 @@ class ConceptMapVisualizer:
         
         return pos
     
-    def generate_graph_image(self, output_path: str = None) -> str:
+    def _content_hash(self, **render_options) -> str:
+        """
+        Hash the loaded concepts, relationships and hierarchy
+        
+        Args:
+            **render_options: Options that change the image (dpi, ...), so each
+                combination gets its own file
+            
+        Returns:
+            str: 16-character hex digest identifying this concept map
+        """
+        content = {'c': self.concepts, 'r': self.relationships, 'h': self.hierarchy, 'o': render_options}
+        if ORJSON_AVAILABLE:
+            payload = orjson.dumps(content, option=orjson.OPT_SORT_KEYS)
+        else:
+            payload = json.dumps(content, sort_keys=True, ensure_ascii=False).encode('utf-8')
+        return hashlib.blake2b(payload).hexdigest()[:16]
+    
+    def _draw_edges(self, ax, xy: np.ndarray, node_sizes: np.ndarray, color: str, draw_labels: bool):
+        """
+        Draw every edge as one LineCollection plus one quiver of arrowheads
+        
+        Args:
+            ax: Axes to draw on (layout must already be final)
+            xy: (N, 2) node positions in data coordinates, in self._node_names order
+            node_sizes: (N,) node marker areas in points^2
+            color: Edge color
+            draw_labels: Whether to draw relationship-type labels at edge midpoints
+        """
+        # Freeze the data limits so the display transform used below stays valid
+        ax.autoscale_view()
+        ax.set_xlim(ax.get_xlim())
+        ax.set_ylim(ax.get_ylim())
+        
+        to_display = ax.transData
+        to_data = to_display.inverted()
+        disp = to_display.transform(xy)
+        radius_px = np.sqrt(node_sizes) / 2 * ax.figure.dpi / 72  # marker area is in points^2
+        
+        src, dst = self._edge_src, self._edge_dst
+        delta = disp[dst] - disp[src]
+        length = np.hypot(delta[:, 0], delta[:, 1])
+        keep = length > 0  # Nothing sensible to draw between coincident nodes
+        src, dst, rel_ids = src[keep], dst[keep], self._edge_rel_ids[keep]
+        unit = delta[keep] / length[keep, None]
+        
+        # Trim both ends to the node circles
+        start = to_data.transform(disp[src] + unit * radius_px[src, None])
+        end = to_data.transform(disp[dst] - unit * radius_px[dst, None])
+        segments = np.stack([start, end], axis=1)
+        
+        ax.add_collection(LineCollection(segments, colors=color, linewidths=2, alpha=0.7, zorder=1), autolim=False)
+        
+        # Arrowheads: head-only quiver arrows with their tips on the target circle
+        ax.quiver(
+            end[:, 0], end[:, 1], unit[:, 0], unit[:, 1],
+            angles='uv', pivot='tip', units='inches', scale_units='inches', scale=1 / 0.15,
+            width=0.02, headwidth=6, headlength=7.5, headaxislength=6.5,
+            color=color, alpha=0.9, zorder=1
+        )
+        
+        if draw_labels:
+            logger.debug("Drawing %d edge labels", len(segments))
+            midpoints = segments.mean(axis=1)
+            # Rotate along the edge, flipped so text never reads upside down
+            angles = np.degrees(np.arctan2(unit[:, 1], unit[:, 0]))
+            angles = np.where(angles > 90, angles - 180, np.where(angles < -90, angles + 180, angles))
+            vocab = self._relationship_vocab
+            for (x, y), angle, rel_id in zip(midpoints.tolist(), angles.tolist(), rel_ids.tolist()):
+                ax.text(
+                    x, y, vocab[rel_id],
+                    fontsize=8, color='#2C3E50', fontweight='bold',  # Dark blue
+                    rotation=angle, rotation_mode='anchor',
+                    horizontalalignment='center', verticalalignment='center',
+                    bbox=dict(boxstyle='round,pad=0.3', facecolor='white', edgecolor='none', alpha=0.7),
+                    zorder=3
+                )
+    
+    @classmethod
+    def render_batch(cls, json_file_paths: List[str], max_workers: int = None) -> List[Optional[str]]:
+        """
+        Render many concept maps in parallel, one worker process per map
+        
+        Args:
+            json_file_paths: Paths to concept map JSON files
+            max_workers: Number of worker processes (default: one per CPU)
+            
+        Returns:
+            list: Image path per input file, in input order (None where loading failed)
+        """
+        logger.info("Rendering %d concept maps in parallel", len(json_file_paths))
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(_render_one, json_file_paths))
+    
+    def generate_graph_image(self, output_path: str = None, dpi: int = 150, max_edge_labels: int = 40) -> str:
         """
         Generate and save the concept map visualization
         
+        Identical concept maps are only rendered once: without a custom
+        output_path the file is named after a hash of the map content, and an
+        existing file with that name is returned as-is.
+        
         Args:
-            output_path: Custom output path (optional)
+            output_path: Custom output path (optional, always re-rendered)
+            dpi: Output resolution (default: 150, print quality at 16x12 inches)
+            max_edge_labels: Above this many edges, relationship types are shown
+                in the legend instead of as per-edge labels (default: 40)
             
         Returns:
             str: Path to the generated image file
         """
         if output_path is None:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            output_path = f"output/concept_map_{timestamp}.png"
+            output_path = f"output/concept_map_{self._content_hash(dpi=dpi, max_edge_labels=max_edge_labels)}.png"
+            if Path(output_path).exists():
+                logger.info("Concept map unchanged, reusing: %s", output_path)
+                return output_path
         
         # Ensure output directory exists
         Path(output_path).parent.mkdir(parents=True, exist_ok=True)
         
-        # Create the plot
-        plt.figure(figsize=(16, 12))
-        plt.clf()
+        # Create the figure once, then just clear the axes on later calls.
+        # Figure() is not registered with pyplot, so it never needs plt.close().
+        if self._fig is None:
+            self._fig = Figure(figsize=(16, 12))
+            self._ax = self._fig.add_subplot()
+        else:
+            self._ax.clear()
+        ax = self._ax
+        
+        relationship_types = []
+        xy = node_sizes_list = None
+        draw_edge_labels = False
         
         # Get hierarchical layout
         pos = self.create_hierarchical_layout()
         
         # Debug: Check if we have nodes and positions
-        logger.info(f"Number of nodes: {len(self.graph.nodes())}")
-        logger.info(f"Number of edges: {len(self.graph.edges())}")
-        logger.info(f"Position count: {len(pos)}")
+        logger.debug("Number of nodes: %d", len(self.graph.nodes()))
+        logger.debug("Number of edges: %d", len(self.graph.edges()))
+        logger.debug("Position count: %d", len(pos))
         
         if len(self.graph.nodes()) == 0:
             logger.warning("No nodes to visualize!")
             # Create a simple error message plot
-            plt.text(0.5, 0.5, 'No concepts to visualize', 
+            ax.text(0.5, 0.5, 'No concepts to visualize', 
                     horizontalalignment='center', verticalalignment='center',
-                    transform=plt.gca().transAxes, fontsize=16)
+                    transform=ax.transAxes, fontsize=16)
         else:
-            # Define colors and styles
-            node_colors = {
-                'fundamental': '#FF6B6B',  # Red
-                'principle': '#4ECDC4',     # Teal
-                'process': '#45B7D1',       # Blue
-                'application': '#96CEB4',   # Green
-                'concept': '#FECA57'        # Yellow (default)
-            }
+            # Gather node colors/sizes from the attribute arrays through the class lookup tables
+            node_colors_list = np.take(self._COLOR_LUT, self._node_type_ids, axis=0)
+            node_sizes_list = np.take(self._SIZE_LUT, self._node_importance_ids)
             
-            edge_colors = {
-                'strong': '#2C3E50',        # Dark blue
-                'medium': '#7F8C8D',        # Gray
-                'weak': '#BDC3C7'           # Light gray
-            }
-            
-            # Draw nodes - get all node attributes first
-            node_colors_list = []
-            node_sizes_list = []
-            for node in self.graph.nodes():
-                node_data = self.graph.nodes[node]
-                node_type = node_data.get('type', 'concept')
-                importance = node_data.get('importance', 'medium')
-                
-                color = node_colors.get(node_type, node_colors['concept'])
-                size = 3000 if importance == 'high' else 2000 if importance == 'medium' else 1500
-                
-                node_colors_list.append(color)
-                node_sizes_list.append(size)
+            xy = np.array([pos[name] for name in self._node_names], dtype=float)
             
-            logger.info(f"Drawing {len(node_colors_list)} nodes")
+            logger.debug("Drawing %d nodes", len(node_colors_list))
             
-            # Draw all nodes at once
-            nx.draw_networkx_nodes(
-                self.graph, pos,
-                node_color=node_colors_list,
-                node_size=node_sizes_list,
+            # Draw all nodes as a single PathCollection
+            node_collection = ax.scatter(
+                xy[:, 0], xy[:, 1],
+                c=node_colors_list,
+                s=node_sizes_list,
                 alpha=0.8,
                 edgecolors='black',
-                linewidths=2
+                linewidths=2,
+                zorder=2
             )
-            
-            # Draw all edges at once if they exist
-            if len(self.graph.edges()) > 0:
-                logger.info(f"Drawing {len(self.graph.edges())} edges")
-                nx.draw_networkx_edges(
-                    self.graph, pos,
-                    edge_color='#7F8C8D',  # Gray
-                    width=2,
-                    alpha=0.7,
-                    arrows=True,
-                    arrowsize=20,
-                    arrowstyle='->'
-                )
-                
-                # Draw edge labels (relationship types)
-                edge_labels = {}
-                for u, v, data in self.graph.edges(data=True):
-                    rel_type = data.get('relationship', 'related')
-                    edge_labels[(u, v)] = rel_type
-                
-                logger.info(f"Drawing {len(edge_labels)} edge labels")
-                nx.draw_networkx_edge_labels(
-                    self.graph, pos,
-                    edge_labels=edge_labels,
-                    font_size=8,
-                    font_color='#2C3E50',  # Dark blue
-                    font_weight='bold',
-                    bbox=dict(boxstyle='round,pad=0.3', facecolor='white', edgecolor='none', alpha=0.7)
-                )
+            node_collection.set_rasterized(True)
             
             # Draw node labels
-            labels = {node: node for node in self.graph.nodes()}
-            nx.draw_networkx_labels(
-                self.graph, pos,
-                labels,
-                font_size=10,
-                font_weight='bold',
-                font_color='black'
-            )
+            for name, (x, y) in zip(self._node_names, xy.tolist()):
+                ax.text(x, y, name, fontsize=10, fontweight='bold', color='black',
+                        horizontalalignment='center', verticalalignment='center', zorder=4)
+            
+            num_edges = len(self._edge_src)
+            draw_edge_labels = num_edges <= max_edge_labels
+            if num_edges > max_edge_labels:
+                # One bbox'd text artist per edge is the slowest part of the render;
+                # list the relationship types in the legend instead
+                logger.info("Skipping edge labels for %d edges (limit: %d)", num_edges, max_edge_labels)
+                relationship_types = [self._relationship_vocab[i] for i in np.unique(self._edge_rel_ids)]
         
         # Add legend
         legend_elements = []
-        for node_type, color in node_colors.items():
+        for node_type, color in self.NODE_COLORS.items():
             legend_elements.append(patches.Patch(color=color, label=f'{node_type.title()} Concept'))
+        for rel_type in relationship_types:
+            legend_elements.append(Line2D([0], [0], color=self.EDGE_COLORS['medium'], linewidth=2, label=rel_type))
         
-        plt.legend(handles=legend_elements, loc='upper left', bbox_to_anchor=(0, 1))
+        ax.legend(handles=legend_elements, loc='upper left', bbox_to_anchor=(0, 1))
         
         # Add title and formatting
-        plt.title('Concept Map Visualization', fontsize=16, fontweight='bold', pad=20)
-        plt.axis('off')
-        plt.tight_layout()
+        ax.set_title('Concept Map Visualization', fontsize=16, fontweight='bold', pad=20)
+        ax.axis('off')
+        self._fig.tight_layout()
         
-        # Save the image
-        plt.savefig(output_path, dpi=300, bbox_inches='tight', facecolor='white', edgecolor='none')
-        plt.close()
+        # Edges are trimmed to the node circles in display space, so they are drawn
+        # once the axes layout is final
+        if len(self._edge_src) > 0 and len(self.graph.nodes()) > 0:
+            logger.debug("Drawing %d edges", len(self._edge_src))
+            self._draw_edges(ax, xy, node_sizes_list, self.EDGE_COLORS['medium'], draw_edge_labels)
         
-        logger.info(f"Concept map saved to: {output_path}")
+        # Encode in memory, then publish atomically so readers never see a partial PNG
+        buf = io.BytesIO()
+        self._fig.savefig(buf, format='png', dpi=dpi, bbox_inches='tight', facecolor='white', edgecolor='none')
+        _atomic_write(output_path, buf.getbuffer())
+        
+        logger.info("Concept map saved to: %s", output_path)
         return output_path
 
 
+def _render_one(json_file_path: str) -> Optional[str]:
+    """
+    Load, extract and render a single concept map (ProcessPoolExecutor worker)
+    
+    Args:
+        json_file_path: Path to the JSON file containing concept map data
+        
+    Returns:
+        str: Path to the generated image, or None if the file could not be loaded
+    """
+    visualizer = ConceptMapVisualizer()
+    if not visualizer.load_from_json(json_file_path):
+        return None
+    visualizer.extract_graph_data()
+    return visualizer.generate_graph_image()
+
+
 def main():
     """Test the visualizer with sample data"""
     visualizer = ConceptMapVisualizer()
@@ -6,18 +6,38 @@ with subtopics, hierarchies, and educational metadata - not limited to predefine
 """
 
 import os
+import sys
+
+# Opt-in startup profiling: CONCEPT_MAP_PROFILE_IMPORTS=1 re-runs this script under
+# `python -X importtime`, which writes a per-module import breakdown to stderr.
+# Visualize it with tuna:
+#   CONCEPT_MAP_PROFILE_IMPORTS=1 python -m concept_map_poc.main_universal --help 2> imports.log
+#   tuna imports.log
+if (__name__ == "__main__" and os.environ.get("CONCEPT_MAP_PROFILE_IMPORTS") == "1"
+        and "importtime" not in sys._xoptions):
+    _target = ["-m", __spec__.name] if __spec__ else [__file__]
+    os.execv(sys.executable, [sys.executable, "-X", "importtime", *_target, *sys.argv[1:]])
+
 import json
+import functools
+import asyncio
 import logging
 import argparse
-import sys
+from collections import deque
 from datetime import datetime
+from itertools import islice
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
-from concept_map_poc.graph import create_description_based_concept_map_graph, print_description_based_workflow_summary
-from concept_map_poc.states import ConceptMapState
+from concept_map_poc.states import ConceptMapState, PROCESSING_LOG_MAXLEN, ERRORS_MAXLEN
 from concept_map_poc.description_analyzer import extract_topic_name_from_description
-from concept_map_poc.graph_visualizer import ConceptMapVisualizer
-from concept_map_poc.token_tracker import get_tracker, reset_tracker
+from concept_map_poc.response_cache import get_cache
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
 
 # Load environment variables
 load_dotenv()
@@ -26,6 +46,12 @@ load_dotenv()
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Characters replaced by '_' in output filenames (spaces, path separators, Windows-reserved)
+_FILENAME_SANITIZE = str.maketrans({c: '_' for c in ' /\\:*?"<>|'})
+
+# Single worker: narration is played back one description at a time
+_tts_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="tts")
+
 # Check LangSmith configuration
 LANGSMITH_ENABLED = os.getenv('LANGCHAIN_TRACING_V2', 'false').lower() == 'true'
 if LANGSMITH_ENABLED:
@@ -36,53 +62,89 @@ else:
     logger.info("ℹ️  LangSmith tracing disabled - Set LANGCHAIN_TRACING_V2=true in .env to enable")
 
 
+def narrate_description(description):
+    """
+    Read the description aloud sentence-by-sentence (runs on the TTS worker thread)
+    
+    The pyttsx3 engine is created here so it lives on the thread that drives it.
+    """
+    try:
+        from tts_handler import TTSHandler
+        logger.info("🎤 Text-to-Speech enabled - Starting narration...")
+        tts = TTSHandler(rate=190, volume=0.9)  # Faster speech rate
+        tts.speak_text_sentence_by_sentence(description, pause_duration=1.0)
+        logger.info("✅ Narration complete")
+    except ImportError:
+        logger.warning("⚠️  pyttsx3 not installed. Install with: pip install pyttsx3")
+        logger.info("Continuing without text-to-speech...")
+    except Exception as e:
+        logger.error(f"❌ TTS error: {e}")
+        logger.info("Continuing without text-to-speech...")
+
+
+def _report_narration(tts_future):
+    """Surface narration errors without waiting for narration that is still playing"""
+    if tts_future is None:
+        return
+    if not tts_future.done():
+        logger.info("🎤 Narration still in progress...")
+        return
+    try:
+        tts_future.result(timeout=0)
+    except Exception as e:
+        logger.error(f"❌ TTS error: {e}")
+
+
+_EDUCATIONAL_LEVELS = (
+    "elementary",
+    "middle school",
+    "high school",
+    "undergraduate",
+    "graduate",
+    "professional",
+    "general audience"
+)
+
+
 def get_educational_levels():
     """Get list of supported educational levels"""
-    return [
-        "elementary",
-        "middle school", 
-        "high school",
-        "undergraduate",
-        "graduate",
-        "professional",
-        "general audience"
-    ]
-
-
-def run_description_based_concept_mapping(description, educational_level="high school", topic_name=None, tts_enabled=True):
+    return list(_EDUCATIONAL_LEVELS)
+
+
+async def run_description_based_concept_mapping(description, educational_level="high school", topic_name=None, tts_enabled=True,
+                                                generate_graph=False):
     """
     Run the description-based concept mapping workflow
     
+    Coroutine - the workflow is awaited with ainvoke so LLM round-trips don't
+    block the event loop. Synchronous callers use asyncio.run(...).
+    
     Args:
         description (str): The description text to analyze (1 word to 3000+ words) - PRIMARY INPUT
         educational_level (str): Target educational level (default: "high school") 
         topic_name (str): Optional topic name (auto-extracted if None)
         tts_enabled (bool): Enable text-to-speech narration (default: True - always enabled)
+        generate_graph (bool): Also render the concept map image; the path is stored as '_image_path'
     """
     
+    # Deferred: pulls in the LangGraph / LangChain / Gemini stack
+    from concept_map_poc.graph import create_description_based_concept_map_graph, print_description_based_workflow_summary
+    from concept_map_poc.token_tracker import get_tracker, reset_tracker
+    
     print("🚀 Description-Based LLM-Powered Concept Map Teaching Agent")
     print("=" * 70)
     print_description_based_workflow_summary()
     
-    # Text-to-Speech narration (if enabled)
-    if tts_enabled:
-        try:
-            from tts_handler import TTSHandler
-            logger.info("🎤 Text-to-Speech enabled - Starting narration...")
-            tts = TTSHandler(rate=190, volume=0.9)  # Faster speech rate
-            tts.speak_text_sentence_by_sentence(description, pause_duration=1.0)
-            logger.info("✅ Narration complete - Proceeding to concept map generation...")
-        except ImportError:
-            logger.warning("⚠️  pyttsx3 not installed. Install with: pip install pyttsx3")
-            logger.info("Continuing without text-to-speech...")
-        except Exception as e:
-            logger.error(f"❌ TTS error: {e}")
-            logger.info("Continuing without text-to-speech...")
+    # Text-to-Speech narration (if enabled) runs on a worker thread, overlapping the LLM work
+    tts_future = _tts_pool.submit(narrate_description, description) if tts_enabled else None
     
     # Auto-extract topic name if not provided
     if not topic_name:
         topic_name = extract_topic_name_from_description(description)
     
+    # One clock read per run, shared by the state, the printed report and the saved file
+    now = datetime.now()
+    
     # Initialize state for new description-based approach
     initial_state = ConceptMapState(
         description=description,
@@ -103,13 +165,36 @@ def run_description_based_concept_mapping(description, educational_level="high s
         subtopic_hierarchies={},
         cross_subtopic_links=[],
         enriched_subtopics={},
-        processing_log=[],
-        errors=[],
+        processing_log=deque(maxlen=PROCESSING_LOG_MAXLEN),
+        errors=deque(maxlen=ERRORS_MAXLEN),
         success=True,
-        timestamp=datetime.now().isoformat()
+        timestamp=now.isoformat()
     )
     
     try:
+        # Serve repeated / near-duplicate descriptions from the response cache
+        cache = get_cache()
+        cached_filepath = cache.get(description, educational_level)
+        if cached_filepath:
+            # Any problem with the cached run falls through to a fresh workflow run
+            try:
+                final_state = load_saved_results(cached_filepath)
+                if final_state.get('educational_level') != educational_level:
+                    logger.info(f"Cached concept map is for level '{final_state.get('educational_level')}', not '{educational_level}' - ignoring")
+                else:
+                    # A semantic hit comes from a differently worded description; the concepts
+                    # carry over, but the run is reported under this request's text and topic
+                    final_state['description'] = description
+                    final_state['topic_name'] = topic_name
+                    print(f"⚡ Reusing cached concept map: {cached_filepath}")
+                    _report_narration(tts_future)
+                    print_results(final_state, now=now)
+                    if generate_graph and final_state.get('success'):
+                        final_state['_image_path'] = _generate_visualization(final_state)
+                    return final_state
+            except Exception as e:
+                logger.error(f"❌ Failed to reuse cached concept map {cached_filepath}: {e}")
+        
         # Reset token tracker for this run
         reset_tracker()
         
@@ -117,20 +202,33 @@ def run_description_based_concept_mapping(description, educational_level="high s
         logger.info("🔄 Starting description-based concept mapping workflow...")
         
         workflow = create_description_based_concept_map_graph()
-        final_state = workflow.invoke(initial_state)
+        final_state = await workflow.ainvoke(initial_state)
         
         # Log token usage summary
         get_tracker().log_summary()
         
         # Print results
-        print_results(final_state)
+        _report_narration(tts_future)
+        print_results(final_state, now=now)
         
         # Save results and get the filepath
-        json_filepath = save_results(final_state)
+        if generate_graph and final_state.get('success'):
+            # JSON serialization + write and matplotlib rendering are independent - overlap them.
+            # The renderer draws on its own Figure, so it is safe on a worker thread.
+            with ThreadPoolExecutor(max_workers=2) as pool:
+                json_future = pool.submit(save_results, final_state, now)
+                image_future = pool.submit(_generate_visualization, final_state)
+                json_filepath = json_future.result()
+                final_state['_image_path'] = image_future.result()
+        else:
+            json_filepath = save_results(final_state, now=now)
         
         # Store the JSON filepath in the result for graph generation
         final_state['_json_filepath'] = json_filepath
         
+        if json_filepath and final_state.get('success'):
+            cache.set(description, educational_level, json_filepath)
+        
         return final_state
         
     except Exception as e:
@@ -155,137 +253,176 @@ def run_universal_concept_mapping(topic_name, educational_level="high school", t
     else:
         description = topic_name
     
-    return run_description_based_concept_mapping(
+    return asyncio.run(run_description_based_concept_mapping(
         description=description,
         educational_level=educational_level,
         topic_name=topic_name
-    )
+    ))
 
 
-def print_results(state: ConceptMapState):
+def _trunc(text: str, limit: int, suffix: str = "...") -> str:
+    """Cut text to limit characters, marking the cut with suffix"""
+    return text if len(text) <= limit else f"{text[:limit]}{suffix}"
+
+
+def print_results(state: ConceptMapState, now: datetime = None):
     """
     Print the results of the description-based concept mapping workflow
-    """
-    print("\n" + "=" * 70)
-    print("📊 DESCRIPTION-BASED CONCEPT MAP RESULTS")
-    print("=" * 70)
     
-    print(f"📚 Topic: {state['topic_name']}")
-    print(f"🎓 Educational Level: {state['educational_level']}")
-    print(f"📝 Description: {state['description'][:200]}{'...' if len(state['description']) > 200 else ''}")
-    print(f"⏰ Timestamp: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-    print()
+    The report is assembled into one list of lines and written in a single call.
+    When stdout is not a terminal (piped, redirected, CI) a one-line JSON summary
+    is printed instead; set CONCEPT_MAP_FORCE_PRETTY=1 to always get the full report.
     
-    # Description analysis statistics
-    if state.get('description_analysis'):
-        analysis = state['description_analysis']
-        print("📈 Description Analysis:")
-        print(f"  • Word count: {analysis.get('word_count', 0)}")
-        print(f"  • Unique words: {analysis.get('unique_words', 0)}")
-        print(f"  • Sentences: {analysis.get('sentence_count', 0)}")
-        print(f"  • Complexity level: {analysis.get('complexity', {}).get('detail_level', 'Unknown')}")
-        print()
+    Args:
+        state: Final workflow state
+        now: Run timestamp (default: current time)
+    """
+    if not sys.stdout.isatty() and not os.environ.get("CONCEPT_MAP_FORCE_PRETTY"):
+        print(json.dumps({
+            "topic": state['topic_name'],
+            "concepts": len(state.get('extracted_concepts', [])),
+            "relationships": len(state.get('concept_relationships', [])),
+            "success": state.get('success', False)
+        }, ensure_ascii=False))
+        return
     
-    # Concept extraction statistics
+    if now is None:
+        now = datetime.now()
+    
+    # Bind every field once
+    topic_name = state['topic_name']
+    description = state['description']
+    analysis = state.get('description_analysis')
     extracted_concepts = state.get('extracted_concepts', [])
     concept_relationships = state.get('concept_relationships', [])
     concept_hierarchy = state.get('concept_hierarchy', [])
+    enriched_concepts = state.get('enriched_concepts', {})
+    learning_objectives = state.get('learning_objectives', [])
+    processing_log = state.get('processing_log')
+    errors = state.get('errors')
     
-    print("📈 Concept Map Statistics:")
-    print(f"  • Extracted concepts: {len(extracted_concepts)}")
-    print(f"  • Concept relationships: {len(concept_relationships)}")
-    print(f"  • Hierarchy levels: {len(concept_hierarchy)}")
-    print(f"  • Enriched concepts: {len(state.get('enriched_concepts', {}))}")
-    print()
+    parts = []
+    add = parts.append
+    
+    add("\n" + "=" * 70)
+    add("📊 DESCRIPTION-BASED CONCEPT MAP RESULTS")
+    add("=" * 70)
+    
+    add(f"📚 Topic: {topic_name}")
+    add(f"🎓 Educational Level: {state['educational_level']}")
+    add(f"📝 Description: {_trunc(description, 200)}")
+    add(f"⏰ Timestamp: {now.strftime('%Y-%m-%d %H:%M:%S')}")
+    add("")
+    
+    # Description analysis statistics
+    if analysis:
+        add("📈 Description Analysis:")
+        add(f"  • Word count: {analysis.get('word_count', 0)}")
+        add(f"  • Unique words: {analysis.get('unique_words', 0)}")
+        add(f"  • Sentences: {analysis.get('sentence_count', 0)}")
+        add(f"  • Complexity level: {analysis.get('complexity', {}).get('detail_level', 'Unknown')}")
+        add("")
+    
+    # Concept extraction statistics
+    add("📈 Concept Map Statistics:")
+    add(f"  • Extracted concepts: {len(extracted_concepts)}")
+    add(f"  • Concept relationships: {len(concept_relationships)}")
+    add(f"  • Hierarchy levels: {len(concept_hierarchy)}")
+    add(f"  • Enriched concepts: {len(enriched_concepts)}")
+    add("")
     
     # Extracted concepts overview
     if extracted_concepts:
-        print("🎯 Extracted Concepts:")
+        add("🎯 Extracted Concepts:")
         for i, concept in enumerate(extracted_concepts, 1):
-            concept_type = concept.get('type', 'Unknown')
-            importance = concept.get('importance', 'Unknown')
-            print(f"  {i}. {concept['name']} ({concept_type}, {importance})")
-            if concept.get('definition'):
-                definition = concept['definition'][:100] + "..." if len(concept['definition']) > 100 else concept['definition']
-                print(f"     └─ {definition}")
-        print()
+            cget = concept.get
+            add(f"  {i}. {concept['name']} ({cget('type', 'Unknown')}, {cget('importance', 'Unknown')})")
+            definition = cget('definition')
+            if definition:
+                add(f"     └─ {_trunc(definition, 100)}")
+        add("")
     
     # Concept relationships overview
     if concept_relationships:
-        print("🔗 Key Concept Relationships:")
-        for i, rel in enumerate(concept_relationships[:10], 1):  # Show first 10 relationships
-            from_concept = rel.get('from_concept', 'Unknown')
-            to_concept = rel.get('to_concept', 'Unknown')
-            rel_type = rel.get('relationship_type', 'related_to')
-            strength = rel.get('strength', 'Unknown')
-            print(f"  {i}. {from_concept} → {rel_type} → {to_concept} ({strength})")
-            if rel.get('relationship_description'):
-                desc = rel['relationship_description'][:80] + "..." if len(rel['relationship_description']) > 80 else rel['relationship_description']
-                print(f"     └─ {desc}")
+        add("🔗 Key Concept Relationships:")
+        for i, rel in enumerate(islice(concept_relationships, 10), 1):  # Show first 10 relationships
+            rget = rel.get
+            add(f"  {i}. {rget('from_concept', 'Unknown')} → {rget('relationship_type', 'related_to')} → "
+                f"{rget('to_concept', 'Unknown')} ({rget('strength', 'Unknown')})")
+            desc = rget('relationship_description')
+            if desc:
+                add(f"     └─ {_trunc(desc, 80)}")
         if len(concept_relationships) > 10:
-            print(f"     ... and {len(concept_relationships) - 10} more relationships")
-        print()
+            add(f"     ... and {len(concept_relationships) - 10} more relationships")
+        add("")
     
     # Learning hierarchy overview
     if concept_hierarchy:
-        print("🏗️ Learning Hierarchy:")
+        add("🏗️ Learning Hierarchy:")
         for level in concept_hierarchy:
-            level_name = level.get('level_name', f"Level {level.get('level', 'Unknown')}")
-            concepts = level.get('concepts', [])
-            difficulty = level.get('difficulty', 'Unknown')
-            print(f"  📚 {level_name} ({difficulty})")
-            if level.get('level_description'):
-                print(f"     {level['level_description']}")
-            for concept in concepts[:5]:  # Show first 5 concepts per level
+            lget = level.get
+            level_name = lget('level_name', f"Level {lget('level', 'Unknown')}")
+            concepts = lget('concepts', [])
+            add(f"  📚 {level_name} ({lget('difficulty', 'Unknown')})")
+            if lget('level_description'):
+                add(f"     {level['level_description']}")
+            for concept in islice(concepts, 5):  # Show first 5 concepts per level
                 concept_name = concept.get('name', 'Unknown') if isinstance(concept, dict) else concept
-                print(f"     • {concept_name}")
+                add(f"     • {concept_name}")
             if len(concepts) > 5:
-                print(f"     ... and {len(concepts) - 5} more concepts")
-            print()
+                add(f"     ... and {len(concepts) - 5} more concepts")
+            add("")
     
     # Learning objectives
-    learning_objectives = state.get('learning_objectives', [])
     if learning_objectives:
-        print("🎯 Learning Objectives:")
-        for i, objective in enumerate(learning_objectives[:5], 1):  # Show first 5 objectives
-            print(f"  {i}. {objective}")
+        add("🎯 Learning Objectives:")
+        for i, objective in enumerate(islice(learning_objectives, 5), 1):  # Show first 5 objectives
+            add(f"  {i}. {objective}")
         if len(learning_objectives) > 5:
-            print(f"     ... and {len(learning_objectives) - 5} more objectives")
-        print()
+            add(f"     ... and {len(learning_objectives) - 5} more objectives")
+        add("")
     
     # Processing log
-    if state.get('processing_log'):
-        print("📋 Processing Summary:")
-        for log_entry in state['processing_log']:
-            print(f"  {log_entry}")
-        print()
+    if processing_log:
+        add("📋 Processing Summary:")
+        parts.extend(f"  {log_entry}" for log_entry in processing_log)
+        add("")
     
     # Error reporting
-    if state.get('errors'):
-        print("⚠️  Errors Encountered:")
-        for error in state['errors']:
-            print(f"  • {error}")
-        print()
+    if errors:
+        add("⚠️  Errors Encountered:")
+        parts.extend(f"  • {error}" for error in errors)
+        add("")
     
     success_status = "✅ Success" if state.get('success', False) else "❌ Failed"
-    print(f"Status: {success_status}")
-    print("=" * 70)
+    add(f"Status: {success_status}")
+    add("=" * 70)
+    add("")
+    
+    sys.stdout.write("\n".join(parts))
 
 
-def save_results(state: ConceptMapState):
+def save_results(state: ConceptMapState, now: datetime = None):
     """
     Save the concept map results to JSON file
     
+    Args:
+        state: Final workflow state
+        now: Run timestamp used for the filename and processing_date (default: current time)
+    
     Returns:
         str: Path to the saved JSON file, or None if failed
     """
+    if now is None:
+        now = datetime.now()
+    
     # Create output directory if it doesn't exist
     output_dir = Path("output")
     output_dir.mkdir(exist_ok=True)
     
     # Generate filename
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    topic_name_clean = state['topic_name'].replace(' ', '_').replace('/', '_')
+    timestamp = now.strftime("%Y%m%d_%H%M%S")
+    topic_name_clean = state['topic_name'].translate(_FILENAME_SANITIZE)
     filename = f"description_based_concept_map_{topic_name_clean}_{timestamp}.json"
     filepath = output_dir / filename
     
@@ -296,7 +433,7 @@ def save_results(state: ConceptMapState):
             "educational_level": state['educational_level'],
             "description": state['description'],
             "timestamp": state['timestamp'],
-            "processing_date": datetime.now().isoformat(),
+            "processing_date": now.isoformat(),
             "success": state['success']
         },
         "description_analysis": state.get('description_analysis', {}),
@@ -307,13 +444,21 @@ def save_results(state: ConceptMapState):
         "enriched_concepts": state.get('enriched_concepts', {}),
         "learning_objectives": state.get('learning_objectives', []),
         "teaching_strategies": state.get('teaching_strategies', []),
-        "processing_log": state.get('processing_log', []),
-        "errors": state.get('errors', [])
+        "processing_log": list(state.get('processing_log', [])),
+        "errors": list(state.get('errors', []))
     }
     
     try:
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(output_data, f, indent=2, ensure_ascii=False)
+        # orjson serializes straight to UTF-8 bytes; same indent=2 layout either way
+        if ORJSON_AVAILABLE:
+            data_bytes = orjson.dumps(output_data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+        else:
+            data_bytes = json.dumps(output_data, indent=2, ensure_ascii=False).encode('utf-8')
+        
+        # Write beside the target and rename, so readers never see a half-written file
+        tmp_filepath = filepath.with_suffix('.json.tmp')
+        tmp_filepath.write_bytes(data_bytes)
+        os.replace(tmp_filepath, filepath)
         
         print(f"💾 Results saved to: {filepath}")
         logger.info(f"Results saved to: {filepath}")
@@ -326,6 +471,77 @@ def save_results(state: ConceptMapState):
         return None
 
 
+def load_saved_results(json_filepath: str) -> dict:
+    """
+    Rebuild a workflow state from a JSON file written by save_results()
+    
+    Args:
+        json_filepath: Path to the saved results JSON
+        
+    Returns:
+        dict: State with the same keys print_results / save_results read
+    """
+    raw = Path(json_filepath).read_bytes()
+    saved = orjson.loads(raw) if ORJSON_AVAILABLE else json.loads(raw)
+    
+    metadata = saved.pop('metadata', {})
+    state = {
+        "topic_name": metadata.get('topic_name', ''),
+        "educational_level": metadata.get('educational_level', ''),
+        "description": metadata.get('description', ''),
+        "timestamp": metadata.get('timestamp', ''),
+        "success": metadata.get('success', False),
+        **saved,
+        "_json_filepath": json_filepath
+    }
+    return state
+
+
+# Reused across runs in one process (keeps its matplotlib Figure between renders)
+_VISUALIZER = None
+
+
+def _generate_visualization(source):
+    """
+    Render the concept map image for a finished run
+    
+    Args:
+        source: Final workflow state dict, or a path to a saved results JSON
+        
+    Returns:
+        str: Path to the generated image, or None on failure
+    """
+    global _VISUALIZER
+    print("\n🎨 Generating concept map visualization...")
+    try:
+        if _VISUALIZER is None:
+            from concept_map_poc.graph_visualizer import ConceptMapVisualizer
+            _VISUALIZER = ConceptMapVisualizer()
+        
+        # A state dict already holds the concept map - no need to re-read the JSON
+        if isinstance(source, dict):
+            loaded = _VISUALIZER.load_from_state(source)
+        else:
+            logger.info(f"Loading visualization from: {source}")
+            loaded = _VISUALIZER.load_from_json(source)
+        if not loaded:
+            print("❌ Failed to load concept map data for visualization")
+            return None
+        
+        stats = _VISUALIZER.extract_graph_data()
+        logger.info(f"Graph stats: {stats}")
+        image_path = _VISUALIZER.generate_graph_image()
+        if image_path:
+            print(f"📊 Concept map visualization saved: {image_path}")
+        else:
+            print("❌ Failed to generate concept map visualization")
+        return image_path
+    except Exception as e:
+        print(f"❌ Error generating visualization: {e}")
+        logger.error(f"Visualization error: {e}")
+        return None
+
+
 def interactive_mode():
     """
     Interactive mode for description-based concept mapping
@@ -410,38 +626,16 @@ def interactive_mode():
                     break
             else:
                 # Run static mode (original behavior)
-                result = run_description_based_concept_mapping(
+                result = asyncio.run(run_description_based_concept_mapping(
                     description=description,
                     educational_level=educational_level,
-                    topic_name=topic_name
-                )
+                    topic_name=topic_name,
+                    generate_graph=True  # Visualization is generated automatically
+                ))
                 
                 if result and result.get('success'):
                     print("\n✅ Concept mapping completed successfully!")
                     
-                    # Generate visualization automatically
-                    print("\n🎨 Generating concept map visualization...")
-                    try:
-                        json_filepath = result.get('_json_filepath')
-                        if json_filepath and Path(json_filepath).exists():
-                            visualizer = ConceptMapVisualizer()
-                            logger.info(f"Loading visualization from: {json_filepath}")
-                            if visualizer.load_from_json(json_filepath):
-                                stats = visualizer.extract_graph_data()
-                                logger.info(f"Graph stats: {stats}")
-                                image_path = visualizer.generate_graph_image()
-                                if image_path:
-                                    print(f"📊 Concept map visualization saved: {image_path}")
-                                else:
-                                    print("❌ Failed to generate concept map visualization")
-                            else:
-                                print("❌ Failed to load JSON data for visualization")
-                        else:
-                            print("❌ JSON file not found for visualization")
-                    except Exception as e:
-                        print(f"❌ Error generating visualization: {e}")
-                        logger.error(f"Visualization error: {e}")
-                    
                     # Ask if user wants to continue
                     continue_choice = input("\n🔄 Generate another concept map? (y/n): ").strip().lower()
                     if continue_choice not in ['y', 'yes']:
@@ -458,10 +652,9 @@ def interactive_mode():
             print("Please try again.")
 
 
-def main():
-    """
-    Main function with command line argument parsing
-    """
+@functools.lru_cache(maxsize=1)
+def _build_parser():
+    """Build the command line parser (once per process)"""
     parser = argparse.ArgumentParser(
         description="Description-Based Universal Concept Map Teaching Agent",
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -500,7 +693,7 @@ Examples:
         "--level", "-l",
         type=str,
         default="high school",
-        choices=get_educational_levels(),
+        choices=_EDUCATIONAL_LEVELS,
         help="Educational level (default: high school)"
     )
     
@@ -548,7 +741,14 @@ Examples:
         help="[LEGACY] Topic description (use --description instead)"
     )
     
-    args = parser.parse_args()
+    return parser
+
+
+def main():
+    """
+    Main function with command line argument parsing
+    """
+    args = _build_parser().parse_args()
     
     # Handle legacy arguments
     if args.topic_name and not args.description:
@@ -582,40 +782,16 @@ Examples:
         return
     
     # Run static description-based concept mapping (TTS always enabled)
-    result = run_description_based_concept_mapping(
+    result = asyncio.run(run_description_based_concept_mapping(
         description=description,
         educational_level=args.level,
         topic_name=topic_name,
-        tts_enabled=True  # TTS always enabled by default
-    )
+        tts_enabled=True,  # TTS always enabled by default
+        generate_graph=True  # Always generate graph in static mode
+    ))
     
     if result and result.get('success'):
         print("\n✅ Concept mapping completed successfully!")
-        
-        # Always generate graph in static mode
-        print("\n🎨 Generating concept map visualization...")
-        try:
-            # Use the exact JSON file that was just created
-            json_filepath = result.get('_json_filepath')
-            if json_filepath and Path(json_filepath).exists():
-                # Create visualizer and generate graph
-                visualizer = ConceptMapVisualizer()
-                logger.info(f"Loading visualization from: {json_filepath}")
-                if visualizer.load_from_json(json_filepath):
-                    stats = visualizer.extract_graph_data()
-                    logger.info(f"Graph stats: {stats}")
-                    image_path = visualizer.generate_graph_image()
-                    if image_path:
-                        print(f"📊 Concept map visualization saved: {image_path}")
-                    else:
-                        print("❌ Failed to generate concept map visualization")
-                else:
-                    print("❌ Failed to load JSON data for visualization")
-            else:
-                print("❌ JSON file not found for visualization")
-        except Exception as e:
-            print(f"❌ Error generating visualization: {e}")
-            logger.error(f"Visualization error: {e}")
     else:
         print("\n❌ Concept mapping failed.")
         sys.exit(1)
@@ -3,20 +3,132 @@ Metrics Logger Module
 =====================
 Local metrics logging system for tracking LLM API calls, token usage, and performance.
 
-Saves each run to JSON files in metrics_logs/ directory for easy inspection and analysis.
+Appends each run as one line to metrics_logs/metrics.jsonl through a single buffered
+writer, so logging costs no per-run file creation and loading is one sequential read.
+log_metrics only queues the record; a background writer thread encodes and writes
+batches once FLUSH_THRESHOLD records are pending, or every FLUSH_INTERVAL_SECONDS;
+anything still pending is flushed at exit.
+Older per-run run_*.json files in the same directory are still read and cleaned up;
+note they store output concepts/relationships as lists of dicts, while JSONL records
+store them column-wise.
 """
 
 import os
+import re
 import json
+import mmap
+import atexit
 import logging
+import sqlite3
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from datetime import datetime
-from typing import Dict, List, Optional
+from itertools import islice
+from operator import attrgetter, itemgetter
+from typing import Dict, Iterator, List, Optional
 from pathlib import Path
 
 logger = logging.getLogger(__name__)
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import fcntl
+    FCNTL_AVAILABLE = True
+except ImportError:
+    FCNTL_AVAILABLE = False
+
+
+def _dumps_line(record: Dict) -> bytes:
+    """Encode one record as a compact UTF-8 JSON line"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(record, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_APPEND_NEWLINE)
+    return (json.dumps(record, ensure_ascii=False, separators=(',', ':')) + '\n').encode('utf-8')
+
+
+# Both accept bytes, so files can be read in binary mode
+_loads = orjson.loads if ORJSON_AVAILABLE else json.loads
+
+# Top-level "timestamp" value of a record; quotes inside string values are escaped,
+# so this cannot match text embedded in e.g. a description preview
+_TIMESTAMP_RE = re.compile(rb'"timestamp":\s*"([^"]+)"')
+
+
+# Fields kept per concept / relationship in a metrics record
+_CONCEPT_KEYS = ('name', 'type', 'importance', 'importance_rank')
+_RELATIONSHIP_KEYS = ('from', 'to', 'relationship')
+_concept_fields = itemgetter(*_CONCEPT_KEYS)
+_relationship_fields = itemgetter(*_RELATIONSHIP_KEYS)
+
+
+def _pick_values(getter: itemgetter, keys: tuple, item: Dict) -> tuple:
+    """Read the given keys out of an LLM item; missing keys become None"""
+    try:
+        return getter(item)
+    except KeyError:
+        # LLM output sometimes omits a field; fall back to per-key lookups
+        return tuple(item.get(key) for key in keys)
+
+
+def _to_columns(getter: itemgetter, keys: tuple, items: List[Dict]) -> Dict[str, list]:
+    """Store items column-wise (one list per key) rather than one dict per item"""
+    columns = zip(*(_pick_values(getter, keys, item) for item in items))
+    return dict(zip(keys, map(list, columns))) if items else {key: [] for key in keys}
+
+
+def _load_mapped(path) -> Dict:
+    """Parse a whole JSON file from a read-only memory map (no intermediate read() copy)"""
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        if ORJSON_AVAILABLE:
+            with memoryview(mm) as view:
+                return orjson.loads(view)
+        return json.loads(mm[:])
+
+
+def _legacy_file_timestamp(entry: os.DirEntry) -> datetime:
+    """Timestamp of a run_YYYYMMDD_HHMMSS_ffffff.json file from its name, else its mtime"""
+    try:
+        return datetime.strptime(entry.name[4:-5], '%Y%m%d_%H%M%S_%f')
+    except ValueError:
+        return datetime.fromtimestamp(entry.stat().st_mtime)
+
+
 # Directory for storing metrics
 METRICS_DIR = Path(__file__).parent / "metrics_logs"
+METRICS_FILE = METRICS_DIR / "metrics.jsonl"
+# Rolling totals behind get_summary_stats, rebuilt from the log when missing
+SUMMARY_FILE = METRICS_DIR / "_summary.json"
+# Sidecar timestamp -> byte offset index into METRICS_FILE, caught up lazily
+INDEX_FILE = METRICS_DIR / "metrics_index.db"
+# flock target shared by every process logging into METRICS_DIR
+LOCK_FILE = METRICS_DIR / ".metrics.lock"
+
+# Batching: the writer thread flushes after this many pending records, or at least this often
+FLUSH_THRESHOLD = 100
+FLUSH_INTERVAL_SECONDS = 5.0
+
+# Shared O_APPEND descriptor for METRICS_FILE (opened on first use) and pending records
+_log_fd: Optional[int] = None
+_log_lock = threading.Lock()
+_buffer: deque = deque()
+# log_metrics only appends to _buffer (deque appends are atomic); encoding and disk I/O
+# happen on the background writer thread, woken early via _flush_event
+_flush_event = threading.Event()
+_writer_thread: Optional[threading.Thread] = None
+_writer_start_lock = threading.Lock()
+_index_conn: Optional[sqlite3.Connection] = None
+_lock_fd: Optional[int] = None
+_lock_pid: Optional[int] = None
+
+# Parallel reads for legacy run_*.json files (I/O bound)
+LOAD_WORKERS = 8
+_load_pool: Optional[ThreadPoolExecutor] = None
 
 
 def ensure_metrics_dir():
@@ -24,6 +136,183 @@ def ensure_metrics_dir():
     METRICS_DIR.mkdir(exist_ok=True)
 
 
+# Created once at import instead of on every log/load call
+ensure_metrics_dir()
+
+
+def _tmp_path(path: Path) -> Path:
+    """Per-process temp name next to path, for write-then-os.replace"""
+    return path.with_name(f"{path.name}.{os.getpid()}.tmp")
+
+
+def _write_all(fd: int, payload: bytes):
+    """os.write until the whole payload is on disk (short writes are rare but legal)"""
+    view = memoryview(payload)
+    while view:
+        view = view[os.write(fd, view):]
+
+
+@contextmanager
+def _process_lock():
+    """
+    Hold an exclusive flock on LOCK_FILE (call with _log_lock held).
+    
+    _log_lock only serialises threads; the Streamlit app and the API servers can log
+    from separate processes, so appends, summary read-modify-writes and rebuilds are
+    also serialised across processes. A no-op where fcntl is unavailable (Windows).
+    """
+    global _lock_fd, _lock_pid
+    if not FCNTL_AVAILABLE:
+        yield
+        return
+    # flock belongs to the open file description, which a forked child shares
+    # with its parent, so each process opens its own
+    if _lock_fd is None or _lock_pid != os.getpid():
+        _lock_fd = os.open(LOCK_FILE, os.O_RDWR | os.O_CREAT | os.O_CLOEXEC, 0o644)
+        _lock_pid = os.getpid()
+    fcntl.flock(_lock_fd, fcntl.LOCK_EX)
+    try:
+        yield
+    finally:
+        fcntl.flock(_lock_fd, fcntl.LOCK_UN)
+
+
+def _get_log_fd() -> int:
+    """Get or open the shared metrics.jsonl append descriptor (call with _process_lock held)"""
+    global _log_fd
+    if _log_fd is not None:
+        # Compaction in another process swaps in a new file; appending through the
+        # old descriptor would write into the unlinked inode and lose the records
+        try:
+            current_inode = METRICS_FILE.stat().st_ino
+        except FileNotFoundError:
+            current_inode = None
+        if current_inode != os.fstat(_log_fd).st_ino:
+            os.close(_log_fd)
+            _log_fd = None
+    if _log_fd is None:
+        _log_fd = os.open(METRICS_FILE, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        # Terminate a line torn by a crash so it can't swallow the next record
+        size = os.fstat(_log_fd).st_size
+        if size:
+            with open(METRICS_FILE, 'rb') as f:
+                f.seek(size - 1)
+                if f.read(1) != b'\n':
+                    _write_all(_log_fd, b'\n')
+    return _log_fd
+
+
+def _flush_locked():
+    """Write all pending records in one call (call with _log_lock held)"""
+    if not _buffer:
+        return
+    # popleft, not list() + clear(): records appended meanwhile stay queued
+    records = [_buffer.popleft() for _ in range(len(_buffer))]
+    lines = b''.join(_dumps_line(record) for record in records)
+    # The append and the summary update happen under one process lock, so another
+    # process never sees (or rebuilds from) a log the summary doesn't match
+    with _process_lock():
+        try:
+            # One O_APPEND write per batch, so concurrent writers never interleave lines
+            _write_all(_get_log_fd(), lines)
+            logger.debug(f"📊 Flushed {len(records)} metrics records to {METRICS_FILE.name}")
+        except Exception as e:
+            logger.error(f"Failed to save {len(records)} metrics records: {e}")
+            return
+        _update_summary_locked(records)
+
+
+def _new_summary() -> Dict:
+    """Empty rolling totals"""
+    return {
+        "total_runs": 0,
+        "successful_runs": 0,
+        "total_tokens": 0,
+        "total_prompt_tokens": 0,
+        "total_completion_tokens": 0,
+        "total_api_duration": 0.0,
+        "total_concepts": 0,
+        "first_run": None,
+        "last_run": None
+    }
+
+
+def _accumulate(summary: Dict, record: Dict):
+    """Fold one metrics record into the rolling totals"""
+    tokens = record['tokens']
+    summary['total_runs'] += 1
+    summary['successful_runs'] += bool(record['status']['success'])
+    summary['total_tokens'] += tokens['total_tokens']
+    summary['total_prompt_tokens'] += tokens['prompt_tokens']
+    summary['total_completion_tokens'] += tokens['completion_tokens']
+    summary['total_api_duration'] += record['timing']['api_duration_seconds']
+    summary['total_concepts'] += record['output']['concepts_count']
+    
+    timestamp = record.get('timestamp', '')
+    if summary['first_run'] is None or timestamp < summary['first_run']:
+        summary['first_run'] = timestamp
+    if summary['last_run'] is None or timestamp > summary['last_run']:
+        summary['last_run'] = timestamp
+
+
+def _read_summary() -> Optional[Dict]:
+    """Load the persisted totals, or None if missing or unreadable"""
+    try:
+        return _loads(SUMMARY_FILE.read_bytes())
+    except (OSError, ValueError):
+        return None
+
+
+def _write_summary(summary: Dict):
+    """Persist the totals atomically"""
+    tmp_path = _tmp_path(SUMMARY_FILE)
+    try:
+        tmp_path.write_bytes(_dumps_line(summary))
+        os.replace(tmp_path, SUMMARY_FILE)
+    except OSError as e:
+        logger.warning(f"Failed to save metrics summary: {e}")
+
+
+def _update_summary_locked(records: List[Dict]):
+    """Add freshly written records to the persisted totals (call with _process_lock held)"""
+    summary = _read_summary()
+    if summary is None:
+        # Nothing to update; the next get_summary_stats rebuilds from the log
+        return
+    for record in records:
+        _accumulate(summary, record)
+    _write_summary(summary)
+
+
+def flush_metrics():
+    """Write any pending metrics records to disk"""
+    with _log_lock:
+        _flush_locked()
+
+
+def _writer_loop():
+    """Background writer: flush when woken for a full batch, or every FLUSH_INTERVAL_SECONDS"""
+    while True:
+        _flush_event.wait(FLUSH_INTERVAL_SECONDS)
+        _flush_event.clear()
+        flush_metrics()
+
+
+def _ensure_writer():
+    """Start the daemon writer thread on first use"""
+    global _writer_thread
+    if _writer_thread is None:
+        with _writer_start_lock:
+            if _writer_thread is None:
+                thread = threading.Thread(target=_writer_loop, name="metrics-writer", daemon=True)
+                thread.start()
+                _writer_thread = thread
+
+
+# The writer is a daemon thread, so drain whatever it has not picked up yet at exit
+atexit.register(flush_metrics)
+
+
 def log_metrics(
     description: str,
     educational_level: str,
@@ -35,7 +324,7 @@ def log_metrics(
     error: Optional[str] = None
 ) -> str:
     """
-    Log metrics for a single LLM API call to a JSON file.
+    Log metrics for a single LLM API call as one line of metrics.jsonl.
     
     Args:
         description: The input description (will be truncated for storage)
@@ -48,19 +337,16 @@ def log_metrics(
         error: Error message if failed
         
     Returns:
-        Path to the saved metrics file
+        Path to the metrics log file
     """
-    ensure_metrics_dir()
-    
     timestamp = datetime.now()
-    filename = f"run_{timestamp.strftime('%Y%m%d_%H%M%S_%f')}.json"
-    filepath = METRICS_DIR / filename
+    description_length = len(description)
     
     metrics_data = {
         "timestamp": timestamp.isoformat(),
         "input": {
-            "description_preview": description[:200] + "..." if len(description) > 200 else description,
-            "description_length": len(description),
+            "description_preview": description[:200] + "..." if description_length > 200 else description,
+            "description_length": description_length,
             "word_count": len(description.split()),
             "educational_level": educational_level
         },
@@ -77,23 +363,9 @@ def log_metrics(
         "output": {
             "concepts_count": len(concepts),
             "relationships_count": len(relationships),
-            "concepts": [
-                {
-                    "name": c.get('name'),
-                    "type": c.get('type'),
-                    "importance": c.get('importance'),
-                    "importance_rank": c.get('importance_rank')
-                }
-                for c in concepts
-            ],
-            "relationships": [
-                {
-                    "from": r.get('from'),
-                    "to": r.get('to'),
-                    "relationship": r.get('relationship')
-                }
-                for r in relationships
-            ]
+            # Column layout: {"name": [...], "type": [...], ...}
+            "concepts": _to_columns(_concept_fields, _CONCEPT_KEYS, concepts),
+            "relationships": _to_columns(_relationship_fields, _RELATIONSHIP_KEYS, relationships)
         },
         "status": {
             "success": success,
@@ -101,41 +373,227 @@ def log_metrics(
         }
     }
     
-    # Write to file
+    # Hand off to the writer thread; the caller never waits on encoding or disk I/O
+    _ensure_writer()
+    _buffer.append(metrics_data)
+    if len(_buffer) >= FLUSH_THRESHOLD:
+        _flush_event.set()
+    logger.info(f"📊 Metrics queued for: {METRICS_FILE.name}")
+    return str(METRICS_FILE)
+
+
+def _get_index_locked() -> sqlite3.Connection:
+    """Get or open the sidecar index connection (call with _log_lock held)"""
+    global _index_conn
+    if _index_conn is None:
+        _index_conn = sqlite3.connect(INDEX_FILE, isolation_level=None, check_same_thread=False)
+        _index_conn.executescript("""
+            CREATE TABLE IF NOT EXISTS runs (
+                offset INTEGER PRIMARY KEY,
+                length INTEGER NOT NULL,
+                ts TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS runs_ts ON runs (ts);
+            CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL);
+        """)
+    return _index_conn
+
+
+def _sync_index_locked() -> sqlite3.Connection:
+    """
+    Index any lines appended to METRICS_FILE since the last sync (call with _log_lock held).
+    
+    The index records the file's inode and indexed size; if the file was replaced
+    (compaction) or shrank, the index is rebuilt from scratch.
+    """
+    conn = _get_index_locked()
+    meta = dict(conn.execute("SELECT key, value FROM meta"))
+    try:
+        stat = METRICS_FILE.stat()
+    except FileNotFoundError:
+        stat = None
+    size = stat.st_size if stat else 0
+    indexed = meta.get('size', 0)
+    if stat is None or meta.get('inode') != stat.st_ino or indexed > size:
+        conn.execute("DELETE FROM runs")
+        indexed = 0
+    if indexed == size:
+        return conn
+    
+    rows = []
+    with open(METRICS_FILE, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        start = indexed
+        while start < size:
+            end = mm.find(b'\n', start, size)
+            end = size if end == -1 else end + 1
+            match = _TIMESTAMP_RE.search(mm, start, end)
+            if match is not None:
+                rows.append((start, end - start, match.group(1).decode('ascii')))
+            elif mm[start:end].strip():
+                logger.warning(f"Unindexed metrics line at byte {start}: no timestamp field")
+            start = end
+    
+    conn.execute("BEGIN")
+    conn.executemany("INSERT OR REPLACE INTO runs (offset, length, ts) VALUES (?, ?, ?)", rows)
+    conn.executemany(
+        "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+        (('size', size), ('inode', stat.st_ino))
+    )
+    conn.execute("COMMIT")
+    return conn
+
+
+def _get_load_pool() -> ThreadPoolExecutor:
+    """Get or create the shared pool for reading legacy per-run files"""
+    global _load_pool
+    if _load_pool is None:
+        _load_pool = ThreadPoolExecutor(max_workers=LOAD_WORKERS, thread_name_prefix="metrics-load")
+    return _load_pool
+
+
+def _list_legacy_files(newest_first: bool = False) -> List[os.DirEntry]:
+    """List run_*.json files with one scandir pass (no glob matching or Path objects)"""
+    try:
+        with os.scandir(METRICS_DIR) as it:
+            entries = [e for e in it if e.name.startswith('run_') and e.name.endswith('.json')]
+    except FileNotFoundError:
+        return []
+    if newest_first:
+        # Filenames embed the timestamp, so name order is chronological
+        entries.sort(key=attrgetter('name'), reverse=True)
+    return entries
+
+
+def _load_legacy_file(entry: os.DirEntry) -> Optional[Dict]:
+    """Load one run_*.json file, or None (with a warning) if it can't be read"""
     try:
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(metrics_data, f, indent=2, ensure_ascii=False)
-        logger.info(f"📊 Metrics saved to: {filepath.name}")
-        return str(filepath)
+        data = _load_mapped(entry.path)
+        data['filename'] = entry.name
+        return data
     except Exception as e:
-        logger.error(f"Failed to save metrics: {e}")
+        logger.warning(f"Failed to load {entry.name}: {e}")
         return None
 
 
-def load_all_metrics() -> List[Dict]:
+def _iter_legacy_files(entries: List[os.DirEntry]) -> Iterator[Dict]:
+    """
+    Load legacy files in parallel, LOAD_WORKERS at a time, yielding in path order.
+    
+    Reads are dispatched one window at a time so a consumer that stops early
+    (get_recent_metrics) doesn't pay for files it never reaches.
     """
-    Load all metrics files from the metrics_logs directory.
+    pool = _get_load_pool()
+    for i in range(0, len(entries), LOAD_WORKERS):
+        for data in pool.map(_load_legacy_file, entries[i:i + LOAD_WORKERS]):
+            if data is not None:
+                yield data
+
+
+def get_metrics_between(start: Optional[datetime] = None, end: Optional[datetime] = None) -> List[Dict]:
+    """
+    Get metrics logged in [start, end) using the sidecar timestamp index.
     
+    Args:
+        start: Earliest timestamp to include (None for no lower bound)
+        end: Timestamp to stop before (None for no upper bound)
+        
     Returns:
-        List of all metrics data, sorted by timestamp (newest first)
+        List of matching metrics data, newest first
     """
-    ensure_metrics_dir()
+    low = start.isoformat() if start else ''
+    high = end.isoformat() if end else '\uffff'
     
-    all_metrics = []
+    results = []
+    with _log_lock:
+        _flush_locked()
+        conn = _sync_index_locked()
+        spans = conn.execute(
+            "SELECT offset, length FROM runs WHERE ts >= ? AND ts < ? ORDER BY ts DESC",
+            (low, high)
+        ).fetchall()
+        if spans:
+            with open(METRICS_FILE, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                for offset, length in spans:
+                    try:
+                        results.append(_loads(mm[offset:offset + length]))
+                    except ValueError as e:
+                        logger.warning(f"Skipping bad line at byte {offset} in {METRICS_FILE.name}: {e}")
     
-    for filepath in METRICS_DIR.glob("run_*.json"):
-        try:
-            with open(filepath, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                data['filename'] = filepath.name
-                all_metrics.append(data)
-        except Exception as e:
-            logger.warning(f"Failed to load {filepath.name}: {e}")
+    # Legacy files are few and carry their timestamp in the name
+    in_range = []
+    for entry in _list_legacy_files(newest_first=True):
+        file_date = _legacy_file_timestamp(entry)
+        if not ((start and file_date < start) or (end and file_date >= end)):
+            in_range.append(entry)
+    results.extend(_iter_legacy_files(in_range))
     
-    # Sort by timestamp, newest first
-    all_metrics.sort(key=lambda x: x.get('timestamp', ''), reverse=True)
+    return results
+
+
+def iter_metrics() -> Iterator[Dict]:
+    """
+    Yield every logged metrics record, legacy run_*.json files first.
+    
+    Yields:
+        Metrics data dicts in file order (not sorted)
+    """
+    flush_metrics()
+    yield from _iter_records()
+
+
+def _iter_records() -> Iterator[Dict]:
+    """Yield records already on disk without flushing (safe with _log_lock held)"""
+    yield from _iter_legacy_files(_list_legacy_files())
+    
+    if not METRICS_FILE.exists():
+        return
+    with open(METRICS_FILE, 'rb') as f:
+        for line_number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                yield _loads(line)
+            except ValueError as e:
+                logger.warning(f"Skipping bad line {line_number} in {METRICS_FILE.name}: {e}")
+
+
+def iter_metrics_newest_first() -> Iterator[Dict]:
+    """
+    Yield logged metrics records newest first, parsing each only when it is reached.
+    
+    metrics.jsonl is append-only, so it is walked backwards line by line; the older
+    run_*.json files follow in reverse filename order (their names sort chronologically).
+    No sort over parsed records is needed.
     
-    return all_metrics
+    Yields:
+        Metrics data dicts, newest first
+    """
+    flush_metrics()
+    if METRICS_FILE.exists() and METRICS_FILE.stat().st_size:
+        with open(METRICS_FILE, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            end = len(mm)
+            while end > 0:
+                start = mm.rfind(b'\n', 0, end - 1) + 1
+                line = mm[start:end]
+                end = start
+                if not line.strip():
+                    continue
+                try:
+                    yield _loads(line)
+                except ValueError as e:
+                    logger.warning(f"Skipping bad line in {METRICS_FILE.name}: {e}")
+    
+    yield from _iter_legacy_files(_list_legacy_files(newest_first=True))
+
+
+def load_all_metrics() -> List[Dict]:
+    """
+    Load all logged metrics from the metrics_logs directory.
+    
+    Returns:
+        List of all metrics data, sorted by timestamp (newest first)
+    """
+    return list(iter_metrics_newest_first())
 
 
 def get_summary_stats() -> Dict:
@@ -145,46 +603,51 @@ def get_summary_stats() -> Dict:
     Returns:
         Dict with summary statistics
     """
-    all_metrics = load_all_metrics()
+    with _log_lock:
+        _flush_locked()
+        with _process_lock():
+            summary = _read_summary()
+            if summary is None:
+                # One streaming pass over the log, then served from SUMMARY_FILE
+                summary = _new_summary()
+                for record in _iter_records():
+                    _accumulate(summary, record)
+                _write_summary(summary)
     
-    if not all_metrics:
+    total_runs = summary['total_runs']
+    successful_runs = summary['successful_runs']
+    total_tokens = summary['total_tokens']
+    total_api_duration = summary['total_api_duration']
+    total_concepts = summary['total_concepts']
+    
+    if not total_runs:
         return {
             "total_runs": 0,
             "message": "No metrics data available"
         }
     
-    total_tokens = sum(m['tokens']['total_tokens'] for m in all_metrics)
-    total_prompt_tokens = sum(m['tokens']['prompt_tokens'] for m in all_metrics)
-    total_completion_tokens = sum(m['tokens']['completion_tokens'] for m in all_metrics)
-    
-    successful_runs = [m for m in all_metrics if m['status']['success']]
-    failed_runs = [m for m in all_metrics if not m['status']['success']]
-    
-    avg_api_duration = sum(m['timing']['api_duration_seconds'] for m in all_metrics) / len(all_metrics)
-    avg_concepts = sum(m['output']['concepts_count'] for m in all_metrics) / len(all_metrics)
-    
     return {
-        "total_runs": len(all_metrics),
-        "successful_runs": len(successful_runs),
-        "failed_runs": len(failed_runs),
-        "success_rate": f"{(len(successful_runs) / len(all_metrics) * 100):.1f}%",
+        "total_runs": total_runs,
+        "successful_runs": successful_runs,
+        "failed_runs": total_runs - successful_runs,
+        "success_rate": f"{(successful_runs / total_runs * 100):.1f}%",
         "tokens": {
             "total_tokens_used": total_tokens,
-            "total_prompt_tokens": total_prompt_tokens,
-            "total_completion_tokens": total_completion_tokens,
-            "avg_tokens_per_run": round(total_tokens / len(all_metrics), 1)
+            "total_prompt_tokens": summary['total_prompt_tokens'],
+            "total_completion_tokens": summary['total_completion_tokens'],
+            "avg_tokens_per_run": round(total_tokens / total_runs, 1)
         },
         "timing": {
-            "avg_api_duration_seconds": round(avg_api_duration, 3),
-            "total_api_time_seconds": round(sum(m['timing']['api_duration_seconds'] for m in all_metrics), 3)
+            "avg_api_duration_seconds": round(total_api_duration / total_runs, 3),
+            "total_api_time_seconds": round(total_api_duration, 3)
         },
         "output": {
-            "avg_concepts_per_run": round(avg_concepts, 1),
-            "total_concepts_extracted": sum(m['output']['concepts_count'] for m in all_metrics)
+            "avg_concepts_per_run": round(total_concepts / total_runs, 1),
+            "total_concepts_extracted": total_concepts
         },
         "date_range": {
-            "first_run": all_metrics[-1]['timestamp'] if all_metrics else None,
-            "last_run": all_metrics[0]['timestamp'] if all_metrics else None
+            "first_run": summary['first_run'],
+            "last_run": summary['last_run']
         }
     }
 
@@ -199,35 +662,72 @@ def get_recent_metrics(limit: int = 10) -> List[Dict]:
     Returns:
         List of recent metrics data
     """
-    all_metrics = load_all_metrics()
-    return all_metrics[:limit]
+    return list(islice(iter_metrics_newest_first(), limit))
 
 
 def clear_old_metrics(days: int = 30):
     """
-    Delete metrics files older than specified days.
+    Delete metrics older than specified days.
+    
+    Compacts metrics.jsonl in place (rewritten to a temp file, then swapped in)
+    and removes old legacy run_*.json files.
     
     Args:
         days: Keep metrics from last N days, delete older ones
+        
+    Returns:
+        Number of records deleted
     """
-    ensure_metrics_dir()
+    global _log_fd
     
     from datetime import timedelta
     cutoff_date = datetime.now() - timedelta(days=days)
     deleted_count = 0
     
-    for filepath in METRICS_DIR.glob("run_*.json"):
+    with _log_lock:
+        _flush_locked()
+        # No other process can append between the copy and the swap
+        with _process_lock():
+            if METRICS_FILE.exists() and METRICS_FILE.stat().st_size:
+                # Index range scan for the lines to drop; everything between them,
+                # including lines the index could not parse, is copied through unchanged
+                conn = _sync_index_locked()
+                drop = conn.execute(
+                    "SELECT offset, length FROM runs WHERE ts < ? ORDER BY offset",
+                    (cutoff_date.isoformat(),)
+                ).fetchall()
+                if drop:
+                    deleted_count += len(drop)
+                    tmp_path = _tmp_path(METRICS_FILE)
+                    with open(METRICS_FILE, 'rb') as src, \
+                            mmap.mmap(src.fileno(), 0, access=mmap.ACCESS_READ) as mm, \
+                            open(tmp_path, 'wb') as dst:
+                        position = 0
+                        for offset, length in drop:
+                            dst.write(mm[position:offset])
+                            position = offset + length
+                        dst.write(mm[position:])
+                    os.replace(tmp_path, METRICS_FILE)
+                    # New inode: the next sync rebuilds the index, and every process's
+                    # next flush (this one included) reopens its append descriptor
+                    if _log_fd is not None:
+                        os.close(_log_fd)
+                        _log_fd = None
+    
+    for entry in _list_legacy_files():
         try:
-            with open(filepath, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                file_date = datetime.fromisoformat(data['timestamp'])
-                
-                if file_date < cutoff_date:
-                    filepath.unlink()
-                    deleted_count += 1
-                    logger.info(f"Deleted old metrics: {filepath.name}")
+            file_date = _legacy_file_timestamp(entry)
+            if file_date < cutoff_date:
+                os.unlink(entry.path)
+                deleted_count += 1
+                logger.info(f"Deleted old metrics: {entry.name}")
         except Exception as e:
-            logger.warning(f"Failed to process {filepath.name}: {e}")
+            logger.warning(f"Failed to process {entry.name}: {e}")
+    
+    if deleted_count:
+        # Totals no longer match the log; rebuilt on the next get_summary_stats
+        with _log_lock, _process_lock():
+            SUMMARY_FILE.unlink(missing_ok=True)
     
-    logger.info(f"🧹 Cleaned up {deleted_count} old metrics files (older than {days} days)")
+    logger.info(f"🧹 Cleaned up {deleted_count} old metrics records (older than {days} days)")
     return deleted_count
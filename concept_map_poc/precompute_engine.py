@@ -6,16 +6,252 @@ This version uses ONLY gTTS and does NOT require MP3 duration reading.
 """
 
 import os
-import tempfile
+import re
+import json
+import random
+import hashlib
+import heapq
+import base64
 import logging
 import time
-from typing import Dict, List, Tuple
+import threading
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, List, Optional, Tuple
 import networkx as nx
+import numpy as np
+import requests
 from pathlib import Path
-from gtts import gTTS
+from gtts import gTTS, gTTSError
 
 logger = logging.getLogger(__name__)
 
+# Retry delays for gTTS (decorrelated jitter between these bounds, in seconds)
+RETRY_BASE_SECONDS = 1.0
+RETRY_CAP_SECONDS = 60.0
+_RETRY_AFTER_RE = re.compile(r'Retry-After[:\s]+(\d+)', re.IGNORECASE)
+
+# Full texts longer than this are synthesized as parallel sentence-aligned chunks
+FULL_TEXT_CHUNK_CHARS = 1500
+_SENTENCE_SPLIT_RE = re.compile(r'(?<=[.!?])\s+')
+
+# Synthesized audio is kept here across runs, one file per (voice, rate, text)
+TTS_CACHE_DIR = Path(os.environ.get("CMAP_TTS_CACHE", "~/.cache/concept_map_tts")).expanduser()
+# Least-recently-used cache files beyond this size are evicted by PrecomputeEngine.cleanup()
+TTS_CACHE_MAX_BYTES = int(os.environ.get("CMAP_TTS_CACHE_MAX_MB", "500")) * 1024 * 1024
+# Prepared graph layouts get their own subdirectory and budget, so either cache can be cleared alone
+LAYOUT_CACHE_DIR = TTS_CACHE_DIR / "layout"
+LAYOUT_CACHE_MAX_BYTES = int(os.environ.get("CMAP_LAYOUT_CACHE_MAX_MB", "50")) * 1024 * 1024
+
+
+def _retry_after_seconds(error: Exception):
+    """Server-requested delay from a failed gTTS call (Retry-After header or message), if any"""
+    response = getattr(error, "rsp", None)
+    if response is not None:
+        header = response.headers.get("Retry-After", "")
+        if header.isdigit():
+            return float(header)
+    match = _RETRY_AFTER_RE.search(str(error))
+    return float(match.group(1)) if match else None
+
+
+# Bump when the edge filter or grid layout changes, so stale cached layouts are ignored
+LAYOUT_CACHE_VERSION = 1
+
+# Concepts from the LLM rate importance as a label; numeric scores pass through
+_IMPORTANCE_LEVELS = {"high": 3.0, "medium": 2.0, "low": 1.0}
+
+
+def _importance_score(value) -> float:
+    """Numeric importance for sorting (labels mapped via _IMPORTANCE_LEVELS, unknown -> 0)"""
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        label = value.strip().lower()
+        if label in _IMPORTANCE_LEVELS:
+            return _IMPORTANCE_LEVELS[label]
+        try:
+            return float(label)
+        except ValueError:
+            return 0.0
+    return 0.0
+
+
+def _tmp_path(path: Path) -> str:
+    """Scratch name next to path, unique per process and thread, for atomic os.replace"""
+    return f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+
+
+def _touch(path: Path):
+    """Mark a cache entry as just used (eviction goes by mtime)"""
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+
+
+def _prune_cache(directory: Path, max_bytes: int, keep=frozenset()) -> int:
+    """
+    Delete the least recently used files in directory until it fits in max_bytes.
+    
+    Cache hits refresh a file's mtime, so oldest mtime is evicted first. In-progress
+    .tmp files, subdirectories and paths in keep are left alone.
+    
+    Args:
+        directory: Cache directory to trim
+        max_bytes: Size budget for the files directly in directory
+        keep: Paths that must not be removed
+        
+    Returns:
+        Number of files removed
+    """
+    entries = []
+    total = 0
+    try:
+        with os.scandir(directory) as it:
+            for entry in it:
+                if entry.is_file(follow_symlinks=False) and not entry.name.endswith(".tmp"):
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+                    total += stat.st_size
+    except FileNotFoundError:
+        return 0
+    
+    removed = 0
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        if path in keep:
+            continue
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass  # Already evicted by another engine
+        except OSError as e:
+            logger.warning(f"⚠️ Could not evict cache file {path}: {e}")
+            continue
+        total -= size
+        removed += 1
+    return removed
+
+
+def _chunk_text(text: str, max_chars: int) -> List[str]:
+    """Group sentences into chunks of at most max_chars (a longer sentence stays whole)"""
+    chunks = []
+    current = ""
+    for sentence in _SENTENCE_SPLIT_RE.split(text.strip()):
+        if current and len(current) + 1 + len(sentence) > max_chars:
+            chunks.append(current)
+            current = sentence
+        else:
+            current = f"{current} {sentence}" if current else sentence
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+class _AdaptiveTokenBucket:
+    """
+    Process-wide adaptive token bucket gating gTTS requests.
+
+    Requests wait for a token instead of firing as fast as possible; the refill
+    rate grows by ALPHA after each success and halves on a 429, so throughput
+    settles just under the service's actual quota.
+    """
+
+    ALPHA = 0.1
+
+    def __init__(self, rate: float = 1.0, min_rate: float = 0.5, max_rate: float = 10.0, capacity: float = 5.0):
+        self.rate = rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.last_refill = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.last_refill) * self.rate)
+        self.last_refill = now
+
+    def acquire(self):
+        """Block until a request token is available, then take it."""
+        while True:
+            with self._lock:
+                self._refill(time.monotonic())
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+    def increase_rate(self):
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate * (1 + self.ALPHA))
+
+    def decrease_rate(self):
+        with self._lock:
+            self.rate = max(self.min_rate, self.rate / 2)
+            self.tokens = min(self.tokens, 0.0)
+
+
+# Shared by every engine in the process, since the quota is per client, not per engine
+_GTTS_RATE_LIMITER = _AdaptiveTokenBucket()
+
+
+class PooledGTTS(gTTS):
+    """
+    gTTS variant that sends every request through a caller-owned requests.Session.
+
+    Stock gTTS opens (and closes) a fresh Session for each text chunk, which pays a
+    new TLS handshake every time. Reusing one Session keeps the connection alive
+    across chunks and across sentences.
+
+    stream() mirrors gTTS 2.5's own stream(), including the private
+    _prepare_requests() and the "jQ1olc" response parsing, so the requirements pin
+    gTTS>=2.5,<2.6; re-check this copy against upstream before raising the pin.
+    """
+
+    def __init__(self, *args, session: requests.Session = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.session = session
+
+    def stream(self):
+        """Same as gTTS.stream(), but sends requests through the shared session."""
+        if self.session is None:
+            yield from super().stream()
+            return
+
+        for idx, pr in enumerate(self._prepare_requests()):
+            _GTTS_RATE_LIMITER.acquire()
+            try:
+                r = self.session.send(
+                    request=pr,
+                    verify=False,
+                    proxies=urllib.request.getproxies(),
+                    timeout=getattr(self, "timeout", None),
+                )
+                r.raise_for_status()
+            except requests.exceptions.HTTPError as e:
+                logger.debug(str(e))
+                if r.status_code == 429:
+                    _GTTS_RATE_LIMITER.decrease_rate()
+                raise gTTSError(tts=self, response=r)
+            except requests.exceptions.RequestException as e:
+                logger.debug(str(e))
+                raise gTTSError(tts=self)
+
+            _GTTS_RATE_LIMITER.increase_rate()
+            for line in r.iter_lines(chunk_size=1024):
+                decoded_line = line.decode("utf-8")
+                if "jQ1olc" in decoded_line:
+                    audio_search = re.search(r'jQ1olc","\[\\"(.*)\\"]', decoded_line)
+                    if audio_search:
+                        yield base64.b64decode(audio_search.group(1).encode("ascii"))
+                    else:
+                        raise gTTSError(tts=self, response=r)
+            logger.debug(f"gTTS part-{idx} created")
+
 
 class PrecomputeEngine:
     """
@@ -23,7 +259,8 @@ class PrecomputeEngine:
     Uses character-based timing with gTTS (no Edge-TTS, no MP3 duration reading).
     """
     
-    def __init__(self, voice: str = "com", rate: str = "+0%", layout_style: str = "hierarchical"):
+    def __init__(self, voice: str = "com", rate: str = "+0%", layout_style: str = "hierarchical",
+                 max_concurrency: int = 4):
         """
         Initialize pre-computation engine with gTTS.
         
@@ -33,50 +270,91 @@ class PrecomputeEngine:
             rate: Not used by gTTS (kept for API compatibility)
             layout_style: Graph layout algorithm (default: hierarchical)
                          Options: "hierarchical", "shell", "circular", "kamada-kawai", "spring"
+            max_concurrency: Maximum number of gTTS requests in flight at once
         """
         self.voice = voice  # Actually TLD for gTTS
         self.rate = rate
         self.layout_style = layout_style
-        self.temp_dir = tempfile.mkdtemp(prefix="concept_map_audio_")
+        self.max_concurrency = max_concurrency
+        self.cache_dir = TTS_CACHE_DIR
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.layout_cache_dir = LAYOUT_CACHE_DIR
+        self.layout_cache_dir.mkdir(parents=True, exist_ok=True)
         self.audio_files = []
+        self._session = None  # Shared HTTP session, created on first audio request
         logger.info(f"🎤 Using gTTS with TLD: {voice}")
         logger.info(f"📐 Using layout: {layout_style}")
-        logger.info(f"📁 Audio temp directory: {self.temp_dir}")
+        logger.info(f"💾 Audio cache directory: {self.cache_dir}")
+        # Trim the cache before this run adds to it
+        self.cleanup()
+    
+    def _get_session(self) -> requests.Session:
+        """Return the shared HTTP session, creating it on first use."""
+        if self._session is None:
+            self._session = requests.Session()
+            # Enough pooled connections for every worker in generate_all_audio
+            adapter = requests.adapters.HTTPAdapter(pool_maxsize=self.max_concurrency)
+            self._session.mount("https://", adapter)
+            # gTTS sends verify=False; silence the per-request urllib3 warning once
+            requests.packages.urllib3.disable_warnings(
+                requests.packages.urllib3.exceptions.InsecureRequestWarning
+            )
+        return self._session
+    
+    def close_session(self):
+        """Close the shared HTTP session (if one was opened)."""
+        if self._session is not None:
+            self._session.close()
+            self._session = None
+    
+    def _cache_path(self, text: str) -> Path:
+        """Cache file for text synthesized with this engine's voice and rate."""
+        key = hashlib.sha1(f"{self.voice}|{self.rate}|{text}".encode("utf-8")).hexdigest()
+        return self.cache_dir / f"{key}.mp3"
     
     def generate_audio_file(self, text: str, index: int, max_retries: int = 5) -> str:
         """
         Generate audio file using gTTS with retry logic for rate limiting.
         
+        Results are cached on disk by voice, rate and text, so a sentence that was
+        synthesized before (in this or an earlier run) costs no network request.
+        
         Args:
             text: Text to synthesize
-            index: Index for filename
+            index: Segment index (for log messages)
             max_retries: Maximum number of retry attempts (default: 5)
             
         Returns:
             Path to generated audio file, or None if all retries fail
         """
-        output_file = os.path.join(self.temp_dir, f"audio_{index}.mp3")
+        cached_file = self._cache_path(text)
+        if cached_file.exists() and cached_file.stat().st_size > 0:
+            _touch(cached_file)
+            self.audio_files.append(str(cached_file))
+            logger.info(f"⚡ Audio cache hit for segment {index}: {cached_file}")
+            return str(cached_file)
+        
+        # Synthesize next to the cache entry, then rename it into place atomically
+        output_file = _tmp_path(cached_file)
         
+        prev_wait = RETRY_BASE_SECONDS
         for attempt in range(max_retries):
             try:
-                if attempt > 0:
-                    # Exponential backoff with longer delays for rate limiting
-                    # Wait: 3s, 6s, 12s, 24s, 48s
-                    wait_time = 3 * (2 ** (attempt - 1))
-                    logger.info(f"⏳ Rate limit detected. Waiting {wait_time}s before retry {attempt + 1}/{max_retries}...")
-                    time.sleep(wait_time)
-                
                 logger.info(f"🎤 Generating audio with gTTS (attempt {attempt + 1}/{max_retries}): \"{text[:50]}...\"")
                 
                 # Generate with gTTS
-                tts = gTTS(text=text, lang='en', tld=self.voice, slow=False)
+                tts = PooledGTTS(text=text, lang='en', tld=self.voice, slow=False, session=self._get_session())
                 tts.save(output_file)
+                os.replace(output_file, cached_file)
                 
-                self.audio_files.append(output_file)
-                logger.info(f"✅ Audio saved successfully: {output_file}")
-                return output_file
+                self.audio_files.append(str(cached_file))
+                logger.info(f"✅ Audio saved successfully: {cached_file}")
+                return str(cached_file)
                 
             except Exception as e:
+                # Drop any partial write so it never becomes a cache entry
+                if os.path.exists(output_file):
+                    os.remove(output_file)
                 error_msg = str(e)
                 if "429" in error_msg or "Too Many Requests" in error_msg:
                     logger.warning(f"⚠️ Rate limited by gTTS (attempt {attempt + 1}/{max_retries}): {e}")
@@ -88,9 +366,62 @@ class PrecomputeEngine:
                     logger.error(f"   This may be due to rate limiting from Google's TTS service.")
                     logger.error(f"   Please try again in a few minutes.")
                     return None
+                
+                # Decorrelated jitter keeps parallel workers from retrying in lockstep;
+                # a Retry-After hint from the server takes precedence
+                wait_time = random.uniform(RETRY_BASE_SECONDS, min(RETRY_CAP_SECONDS, max(3.0, prev_wait * 3)))
+                retry_after = _retry_after_seconds(e)
+                if retry_after is not None:
+                    wait_time = min(retry_after, RETRY_CAP_SECONDS)
+                prev_wait = wait_time
+                logger.info(f"⏳ Waiting {wait_time:.1f}s before retry {attempt + 2}/{max_retries}...")
+                time.sleep(wait_time)
         
         return None
     
+    def generate_chunked_audio(self, text: str, max_chars: int = FULL_TEXT_CHUNK_CHARS) -> str:
+        """
+        Synthesize long text as sentence-aligned chunks in parallel and join them.
+        
+        Each chunk is its own gTTS request (and cache entry), so a 429 costs one
+        chunk's retry instead of the whole text. gTTS output is plain MP3 frames
+        from one encoder, so the chunks are joined by byte concatenation.
+        
+        Args:
+            text: Text to synthesize
+            max_chars: Maximum characters per chunk
+            
+        Returns:
+            Path to the joined audio file, or None if any chunk fails
+        """
+        cached_file = self._cache_path(text)
+        if cached_file.exists() and cached_file.stat().st_size > 0:
+            _touch(cached_file)
+            self.audio_files.append(str(cached_file))
+            logger.info(f"⚡ Audio cache hit for full text: {cached_file}")
+            return str(cached_file)
+        
+        chunks = _chunk_text(text, max_chars)
+        logger.info(f"  ✂️ Synthesizing {len(chunks)} chunks with up to {self.max_concurrency} workers")
+        self._get_session()  # Create the shared session before the workers start
+        with ThreadPoolExecutor(max_workers=self.max_concurrency) as pool:
+            chunk_files = list(pool.map(self.generate_audio_file, chunks, range(len(chunks))))
+        
+        if not all(chunk_files):
+            logger.error(f"❌ {chunk_files.count(None)}/{len(chunks)} audio chunks failed")
+            return None
+        
+        output_file = _tmp_path(cached_file)
+        with open(output_file, "wb") as out:
+            for chunk_file in chunk_files:
+                with open(chunk_file, "rb") as f:
+                    out.write(f.read())
+        os.replace(output_file, cached_file)
+        
+        self.audio_files.append(str(cached_file))
+        logger.info(f"✅ Joined {len(chunks)} audio chunks: {cached_file}")
+        return str(cached_file)
+    
     def generate_all_audio(self, timeline: Dict) -> Dict:
         """
         Pre-generate audio for the full timeline using gTTS.
@@ -114,23 +445,30 @@ class PrecomputeEngine:
         
         if not full_text:
             logger.warning("⚠️ No full_text in timeline, falling back to sentences")
-            # Fallback: use legacy sentence structure
+            # Fallback: use legacy sentence structure, synthesized by a bounded worker
+            # pool (the shared rate limiter keeps the workers under the gTTS quota)
             total_sentences = len(timeline["sentences"])
-            for sentence_data in timeline["sentences"]:
-                idx = sentence_data["index"]
-                text = sentence_data["text"]
-                
-                logger.info(f"  🎤 Generating audio {idx + 1}/{total_sentences}: \"{text[:50]}...\"")
+            self._get_session()  # Create the shared session before the workers start
+            with ThreadPoolExecutor(max_workers=self.max_concurrency) as pool:
+                futures = {}
+                for sentence_data in timeline["sentences"]:
+                    idx = sentence_data["index"]
+                    text = sentence_data["text"]
+                    logger.info(f"  🎤 Generating audio {idx + 1}/{total_sentences}: \"{text[:50]}...\"")
+                    futures[pool.submit(self.generate_audio_file, text, idx)] = sentence_data
                 
-                audio_file = self.generate_audio_file(text, idx)
-                sentence_data["audio_file"] = audio_file
+                for future in as_completed(futures):
+                    futures[future]["audio_file"] = future.result()
             
             logger.info(f"✅ Generated {total_sentences} audio files (legacy mode)")
             return timeline
         
         # Generate audio file with gTTS
         logger.info(f"  🎤 Generating audio for full text: \"{full_text[:100]}...\"")
-        audio_file = self.generate_audio_file(full_text, 0)
+        if len(full_text) > FULL_TEXT_CHUNK_CHARS:
+            audio_file = self.generate_chunked_audio(full_text)
+        else:
+            audio_file = self.generate_audio_file(full_text, 0)
         
         if audio_file and os.path.exists(audio_file):
             # Store audio file in timeline (top-level for compatibility)
@@ -147,7 +485,12 @@ class PrecomputeEngine:
         
         return timeline
     
-    def calculate_positions(self, G: nx.DiGraph, concepts: List[Dict]) -> Dict[str, Tuple[float, float]]:
+    def calculate_positions(
+        self,
+        G: nx.DiGraph,
+        importance: Dict[str, float],
+        roots: Optional[Tuple[str, ...]] = None
+    ) -> Dict[str, Tuple[float, float]]:
         """
         Calculate node positions using Smart Grid Layout.
         
@@ -159,7 +502,8 @@ class PrecomputeEngine:
         
         Args:
             G: NetworkX directed graph
-            concepts: List of concept dicts
+            importance: Concept name -> importance score (see prepare_graph)
+            roots: Nodes with no incoming edges, in node order (found here if None)
             
         Returns:
             Dict mapping concept names to (x, y) positions
@@ -169,7 +513,9 @@ class PrecomputeEngine:
         pos = {}
         
         # Find root node (no incoming edges)
-        root_nodes = [n for n in G.nodes() if G.in_degree(n) == 0]
+        if roots is None:
+            roots = tuple(n for n, degree in G.in_degree() if degree == 0)
+        root_nodes = list(roots)
         
         if not root_nodes:
             logger.warning("⚠️ No root node found, using first node")
@@ -187,26 +533,25 @@ class PrecomputeEngine:
             logger.info(f"  📍 Root '{root}' at (0, 0)")
         
         # Get non-root nodes sorted by importance
-        non_root_nodes = [n for n in G.nodes() if n not in root_nodes]
+        root_set = set(root_nodes)
+        non_root_nodes = [n for n in G.nodes() if n not in root_set]
         
-        # Sort by importance (from concepts list)
-        concept_dict = {c['name']: c for c in concepts}
+        # Sort by importance
         non_root_nodes_sorted = sorted(
             non_root_nodes,
-            key=lambda n: concept_dict.get(n, {}).get('importance', 0),
+            key=lambda n: importance.get(n, 0.0),
             reverse=True
         )
         
-        # Place nodes in grid (3 columns, sequential fill)
-        for idx, node in enumerate(non_root_nodes_sorted):
-            col = idx % COLUMNS
-            row = idx // COLUMNS + 1  # +1 because root is at row 0
-            
-            x = COL_X_POSITIONS[col]
-            y = -row * VERTICAL_SPACING
-            
-            pos[node] = (x, y)
-            logger.debug(f"  📍 '{node}' at ({x}, {y})")
+        # Place nodes in grid (3 columns, sequential fill), all positions at once
+        idx = np.arange(len(non_root_nodes_sorted))
+        xs = np.array(COL_X_POSITIONS)[idx % COLUMNS]
+        ys = -(idx // COLUMNS + 1) * VERTICAL_SPACING  # +1 because root is at row 0
+        pos.update(zip(non_root_nodes_sorted, zip(xs.tolist(), ys.tolist())))
+        
+        if logger.isEnabledFor(logging.DEBUG):
+            for node in non_root_nodes_sorted:
+                logger.debug(f"  📍 '{node}' at {pos[node]}")
         
         logger.info(f"✅ Positioned {len(pos)} nodes in Smart Grid layout")
         return pos
@@ -214,7 +559,7 @@ class PrecomputeEngine:
     def _filter_edges_by_incoming_limit(
         self, 
         G: nx.DiGraph, 
-        concepts: List[Dict],
+        importance: Dict[str, float],
         max_incoming: int = 2
     ) -> List[Tuple[str, str]]:
         """
@@ -225,7 +570,7 @@ class PrecomputeEngine:
         
         Args:
             G: NetworkX directed graph
-            concepts: List of concept dicts with importance scores
+            importance: Concept name -> importance score (see prepare_graph)
             max_incoming: Maximum incoming edges per node (except root)
             
         Returns:
@@ -233,33 +578,21 @@ class PrecomputeEngine:
         """
         logger.info(f"🔗 Filtering edges: max {max_incoming} incoming per node...")
         
-        # Create importance lookup
-        concept_dict = {c['name']: c for c in concepts}
-        
-        # Find root nodes
-        root_nodes = {n for n in G.nodes() if G.in_degree(n) == 0}
-        
         edges_to_keep = []
         
-        for node in G.nodes():
-            if node in root_nodes:
+        # One pass over the predecessor map (same edge order as G.in_edges(node))
+        for node, predecessors in G.pred.items():
+            if not predecessors:
                 continue  # Root has no incoming edges
             
-            # Get all incoming edges
-            incoming = list(G.in_edges(node))
+            incoming = [(source, node) for source in predecessors]
             
             if len(incoming) <= max_incoming:
                 edges_to_keep.extend(incoming)
             else:
-                # Sort by source importance (higher importance = keep)
-                incoming_sorted = sorted(
-                    incoming,
-                    key=lambda e: concept_dict.get(e[0], {}).get('importance', 0),
-                    reverse=True
-                )
-                
-                # Keep top max_incoming edges
-                edges_to_keep.extend(incoming_sorted[:max_incoming])
+                # Keep the top max_incoming edges by source importance (higher = keep);
+                # nlargest matches sorted(..., reverse=True)[:k] without a full sort
+                edges_to_keep.extend(heapq.nlargest(max_incoming, incoming, key=lambda e: importance.get(e[0], 0.0)))
                 
                 dropped = len(incoming) - max_incoming
                 logger.debug(f"  📉 Node '{node}': kept {max_incoming}/{len(incoming)} edges (dropped {dropped})")
@@ -267,10 +600,63 @@ class PrecomputeEngine:
         logger.info(f"✅ Filtered edges: {len(edges_to_keep)}/{G.number_of_edges()} kept")
         return edges_to_keep
     
+    def _layout_cache_path(self, concepts: List[Dict], relationships: List[Dict]) -> Path:
+        """Cache file for the filtered edges and positions of this concept/relationship set."""
+        # Input order is part of the key: node order decides the root and grid ties
+        content = json.dumps([
+            LAYOUT_CACHE_VERSION,
+            [(c["name"], c.get("importance", 0)) for c in concepts],
+            [(r["from"], r["to"], r.get("relationship", "")) for r in relationships],
+        ], ensure_ascii=False)
+        key = hashlib.sha1(content.encode("utf-8")).hexdigest()
+        return self.layout_cache_dir / f"{key}.json"
+    
+    @staticmethod
+    def _read_layout_cache(layout_file: Path):
+        """
+        Load cached (edges, positions), or None on a miss.
+        
+        A missing (e.g. just evicted by another engine's cleanup), truncated or
+        malformed file counts as a miss, so the layout is simply recomputed.
+        """
+        try:
+            with open(layout_file, "r", encoding="utf-8") as f:
+                cached = json.load(f)
+            edges = [(source, target, label) for source, target, label in cached["edges"]]
+            pos = {name: (float(x), float(y)) for name, (x, y) in cached["pos"].items()}
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.warning(f"⚠️ Ignoring unreadable layout cache {layout_file}: {e}")
+            return None
+        _touch(layout_file)
+        return edges, pos
+    
+    @staticmethod
+    def _write_layout_cache(layout_file: Path, G: nx.DiGraph, pos: Dict):
+        """Persist the filtered edges and positions atomically (failures are only logged)"""
+        output_file = _tmp_path(layout_file)
+        try:
+            with open(output_file, "w", encoding="utf-8") as f:
+                json.dump({
+                    "edges": [[source, target, label] for source, target, label in G.edges(data="label")],
+                    "pos": pos
+                }, f, ensure_ascii=False)
+            os.replace(output_file, layout_file)
+        except (OSError, TypeError, ValueError) as e:
+            logger.warning(f"⚠️ Failed to save layout cache {layout_file}: {e}")
+            try:
+                os.remove(output_file)
+            except OSError:
+                pass
+    
     def prepare_graph(self, timeline: Dict) -> Tuple[nx.DiGraph, Dict]:
         """
         Prepare graph with positions and filtered edges.
         
+        The filtered edges and positions are cached on disk by the concepts and
+        relationships, so an unchanged timeline skips filtering and layout.
+        
         Args:
             timeline: Timeline dict with concepts and relationships
             
@@ -287,8 +673,17 @@ class PrecomputeEngine:
         for concept in concepts:
             G.add_node(concept["name"])
         
-        # Add all edges first
         relationships = timeline.get("relationships", [])
+        layout_file = self._layout_cache_path(concepts, relationships)
+        cached = self._read_layout_cache(layout_file)
+        if cached is not None:
+            cached_edges, pos = cached
+            for source, target, label in cached_edges:
+                G.add_edge(source, target, label=label)
+            logger.info(f"⚡ Layout cache hit: {layout_file}")
+            return G, pos
+        
+        # Add all edges first
         for rel in relationships:
             if rel["from"] in G.nodes() and rel["to"] in G.nodes():
                 G.add_edge(
@@ -300,33 +695,42 @@ class PrecomputeEngine:
         logger.info(f"  �� Graph: {G.number_of_nodes()} nodes, {G.number_of_edges()} edges (before filtering)")
         
         # Filter edges (max 2 incoming per node)
-        edges_to_keep = self._filter_edges_by_incoming_limit(G, concepts, max_incoming=2)
+        # Importance lookup shared by the edge filter and the layout
+        importance = {c['name']: _importance_score(c.get('importance', 0)) for c in concepts}
         
-        # Create new filtered graph
-        G_filtered = nx.DiGraph()
-        G_filtered.add_nodes_from(G.nodes())
+        edges_to_keep = self._filter_edges_by_incoming_limit(G, importance, max_incoming=2)
         
-        for source, target in edges_to_keep:
-            label = G[source][target].get("label", "")
-            G_filtered.add_edge(source, target, label=label)
+        # Filter the transient graph in place: edge labels and node order (which
+        # decides the root and grid ties) stay as they are, with no second graph.
+        # G.edge_subgraph() would move isolated nodes to the end.
+        kept = set(edges_to_keep)
+        G.remove_edges_from([edge for edge in G.edges() if edge not in kept])
+        G_filtered = G
         
         logger.info(f"  📊 Filtered graph: {G_filtered.number_of_nodes()} nodes, {G_filtered.number_of_edges()} edges")
         
         # Calculate positions
-        pos = self.calculate_positions(G_filtered, concepts)
+        # Roots found once, in one in_degree pass (the edge filter reads them off G.pred)
+        roots = tuple(n for n, degree in G_filtered.in_degree() if degree == 0)
+        pos = self.calculate_positions(G_filtered, importance, roots)
+        
+        self._write_layout_cache(layout_file, G_filtered, pos)
         
         logger.info("✅ Graph preparation complete")
         return G_filtered, pos
     
     def cleanup(self):
-        """Clean up temporary audio files."""
-        import shutil
-        if os.path.exists(self.temp_dir):
-            try:
-                shutil.rmtree(self.temp_dir)
-                logger.info(f"🧹 Cleaned up temp directory: {self.temp_dir}")
-            except Exception as e:
-                logger.warning(f"⚠️ Could not clean up temp directory: {e}")
+        """
+        Trim the audio cache to TTS_CACHE_MAX_BYTES and the layout cache to
+        LAYOUT_CACHE_MAX_BYTES, least recently used first.
+        
+        Audio is written straight into the shared cache, so there is no per-run
+        directory to delete; files produced by this engine are never evicted here.
+        """
+        removed = _prune_cache(self.cache_dir, TTS_CACHE_MAX_BYTES, keep=frozenset(self.audio_files))
+        removed += _prune_cache(self.layout_cache_dir, LAYOUT_CACHE_MAX_BYTES)
+        if removed:
+            logger.info(f"🧹 Evicted {removed} cache files from {self.cache_dir}")
     
     def precompute_all(self, timeline: Dict) -> Dict:
         """
@@ -345,7 +749,10 @@ class PrecomputeEngine:
         logger.info("=" * 70)
         
         # Step 1: Generate audio with gTTS (character-based timing already set)
-        timeline = self.generate_all_audio(timeline)
+        try:
+            timeline = self.generate_all_audio(timeline)
+        finally:
+            self.close_session()
         
         # Step 2: Prepare graph and calculate layout
         G, pos = self.prepare_graph(timeline)
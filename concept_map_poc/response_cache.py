@@ -0,0 +1,145 @@
+"""
+Response Cache Module
+=====================
+Caches finished concept map runs keyed on (educational level, description).
+
+Lookups go through two layers:
+1. Exact match - in-process TTL cache keyed on a SHA-256 of level + description,
+   so a repeated prompt never pays for an embedding.
+2. Semantic match - a `sulci` SQLite cache (cosine similarity >= 0.85), so
+   near-duplicate descriptions ("Photosynthesis" / "How photosynthesis works")
+   reuse an earlier run. Each educational level gets its own sulci cache and only
+   the description is embedded, so a run is never served to a different level.
+
+Values are paths to the results JSON written by save_results(); an entry whose
+file has since been deleted counts as a miss. Both layers are optional: without
+`cachetools` the exact layer is a plain dict, and without `sulci` only exact
+matches are served.
+"""
+
+import re
+import hashlib
+import logging
+from pathlib import Path
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+try:
+    from cachetools import TTLCache
+    CACHETOOLS_AVAILABLE = True
+except ImportError:
+    CACHETOOLS_AVAILABLE = False
+
+try:
+    import sulci
+    SULCI_AVAILABLE = True
+except ImportError:
+    SULCI_AVAILABLE = False
+
+SIMILARITY_THRESHOLD = 0.85
+CACHE_TTL_SECONDS = 86400
+EXACT_CACHE_SIZE = 1000
+SEMANTIC_CACHE_DIR = "output/concept_map_cache"
+
+
+class ConceptMapCache:
+    """Exact + semantic cache mapping (description, level) to a saved results JSON path"""
+
+    def __init__(self, db_path: str = SEMANTIC_CACHE_DIR, threshold: float = SIMILARITY_THRESHOLD):
+        self.db_path = db_path
+        self.threshold = threshold
+        if CACHETOOLS_AVAILABLE:
+            self._exact = TTLCache(maxsize=EXACT_CACHE_SIZE, ttl=CACHE_TTL_SECONDS)
+        else:
+            self._exact = {}
+        self._semantic: Dict[str, "sulci.Cache"] = {}
+        self._semantic_failed = False
+
+    @staticmethod
+    def _key(description: str, educational_level: str) -> str:
+        return f"{educational_level}|{description}"
+
+    def _get_semantic(self, educational_level: str):
+        """Create the sulci cache for this level on first use (loads the embedding model)"""
+        semantic = self._semantic.get(educational_level)
+        if semantic is None and SULCI_AVAILABLE and not self._semantic_failed:
+            level_dir = re.sub(r"[^a-z0-9]+", "_", educational_level.lower()).strip("_") or "default"
+            try:
+                semantic = sulci.Cache(
+                    backend="sqlite",
+                    threshold=self.threshold,
+                    ttl_seconds=CACHE_TTL_SECONDS,
+                    db_path=str(Path(self.db_path) / level_dir),
+                    telemetry=False
+                )
+            except Exception as e:
+                self._semantic_failed = True
+                logger.warning(f"⚠️ Semantic cache unavailable, using exact matches only: {e}")
+            else:
+                self._semantic[educational_level] = semantic
+        return semantic
+
+    def get(self, description: str, educational_level: str) -> Optional[str]:
+        """
+        Look up a previous run for this description and level
+
+        Args:
+            description: Description text
+            educational_level: Target educational level
+
+        Returns:
+            str: Path to the cached results JSON, or None on a miss
+        """
+        key = self._key(description, educational_level)
+        digest = hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+        json_filepath = self._exact.get(digest)
+        if json_filepath and Path(json_filepath).exists():
+            logger.info(f"⚡ Exact cache hit: {json_filepath}")
+            return json_filepath
+
+        semantic = self._get_semantic(educational_level)
+        if semantic is None:
+            return None
+        try:
+            json_filepath, similarity, _ = semantic.get(description)
+        except Exception as e:
+            logger.warning(f"⚠️ Semantic cache lookup failed: {e}")
+            return None
+        if json_filepath and Path(json_filepath).exists():
+            logger.info(f"⚡ Semantic cache hit (similarity {similarity:.2f}): {json_filepath}")
+            self._exact[digest] = json_filepath
+            return json_filepath
+        return None
+
+    def set(self, description: str, educational_level: str, json_filepath: str):
+        """
+        Record the results JSON for this description and level
+
+        Args:
+            description: Description text
+            educational_level: Target educational level
+            json_filepath: Path returned by save_results()
+        """
+        key = self._key(description, educational_level)
+        self._exact[hashlib.sha256(key.encode("utf-8")).hexdigest()] = json_filepath
+
+        semantic = self._get_semantic(educational_level)
+        if semantic is not None:
+            try:
+                semantic.set(description, json_filepath)
+            except Exception as e:
+                logger.warning(f"⚠️ Semantic cache write failed: {e}")
+
+
+# Global cache instance
+_global_cache: Optional[ConceptMapCache] = None
+
+
+def get_cache() -> ConceptMapCache:
+    """Get or create the global concept map cache"""
+    global _global_cache
+    if _global_cache is None:
+        _global_cache = ConceptMapCache()
+    return _global_cache
@@ -5,41 +5,74 @@ This module defines the state structure for the description-based concept mappin
 that can extract concepts directly from user descriptions of any length (1 word to 3000+ words).
 """
 
-from typing import Dict, List, Any, TypedDict
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Deque, Dict, FrozenSet, List, Any
 
+# Caps for the append-only logs; the oldest entries are dropped past these
+PROCESSING_LOG_MAXLEN = 1000
+ERRORS_MAXLEN = 256
 
-class ConceptMapState(TypedDict):
-    """State structure for the description-based concept mapping workflow"""
+# Output sections the combined extraction call can produce; "concepts" is always included
+CONCEPT_MAP_SECTIONS = frozenset({"concepts", "relationships", "hierarchy", "enrichment"})
+
+
+@dataclass(slots=True)
+class ConceptMapState:
+    """
+    State structure for the description-based concept mapping workflow
+    
+    A slotted dataclass (no per-instance __dict__). state['key'], state['key'] = value
+    and state.get('key', default) are kept so node code written against the
+    dict-style state works unchanged.
+    """
     
     # Primary inputs
-    description: str                   # The main description text (1 word to 3000+ words) - PRIMARY INPUT
-    educational_level: str             # Target educational level (e.g., "elementary", "high school", "graduate")
-    topic_name: str                    # Topic name (auto-extracted if not provided)
+    description: str = ""                   # The main description text (1 word to 3000+ words) - PRIMARY INPUT
+    educational_level: str = "high school"  # Target educational level (e.g., "elementary", "high school", "graduate")
+    topic_name: str = ""                    # Topic name (auto-extracted if not provided)
+    requested_fields: FrozenSet[str] = CONCEPT_MAP_SECTIONS  # Sections to generate (subset of CONCEPT_MAP_SECTIONS)
     
     # Description analysis results
-    description_analysis: Dict[str, Any]  # Results from description_analyzer.analyze_description_complexity()
-    complexity_config: Dict[str, Any]     # Adjusted complexity configuration for this description
+    description_analysis: Dict[str, Any] = field(default_factory=dict)  # Results from description_analyzer.analyze_description_complexity()
+    complexity_config: Dict[str, Any] = field(default_factory=dict)     # Adjusted complexity configuration for this description
     
     # Extracted concepts (NEW APPROACH - Direct extraction from description)
-    extracted_concepts: List[Dict[str, Any]]        # Key concepts extracted directly from description
-    concept_relationships: List[Dict[str, Any]]     # Relationships between extracted concepts
-    concept_hierarchy: List[Dict[str, Any]]         # Hierarchical organization of concepts
+    extracted_concepts: List[Dict[str, Any]] = field(default_factory=list)     # Key concepts extracted directly from description
+    concept_relationships: List[Dict[str, Any]] = field(default_factory=list)  # Relationships between extracted concepts
+    concept_hierarchy: List[Dict[str, Any]] = field(default_factory=list)      # Hierarchical organization of concepts
     
     # Educational enrichment
-    enriched_concepts: Dict[str, Dict[str, Any]]    # Concepts enhanced with educational metadata
-    learning_objectives: List[str]                   # Generated learning objectives
-    teaching_strategies: List[Dict[str, Any]]       # Recommended teaching approaches
+    enriched_concepts: Dict[str, Dict[str, Any]] = field(default_factory=dict)  # Concepts enhanced with educational metadata
+    learning_objectives: List[str] = field(default_factory=list)                # Generated learning objectives
+    teaching_strategies: List[Dict[str, Any]] = field(default_factory=list)     # Recommended teaching approaches
     
     # Legacy fields (for backward compatibility - may be deprecated)
-    raw_subtopics: List[str]                        # DEPRECATED: Use extracted_concepts instead
-    subtopic_concepts: Dict[str, List[Dict[str, Any]]]  # DEPRECATED
-    key_concepts_per_subtopic: Dict[str, List[Dict[str, Any]]]  # DEPRECATED
-    subtopic_hierarchies: Dict[str, List[Dict[str, Any]]]  # DEPRECATED
-    cross_subtopic_links: List[Dict[str, Any]]      # DEPRECATED: Use concept_relationships instead
-    enriched_subtopics: Dict[str, Dict[str, Any]]   # DEPRECATED: Use enriched_concepts instead
+    raw_subtopics: List[str] = field(default_factory=list)                                 # DEPRECATED: Use extracted_concepts instead
+    subtopic_concepts: Dict[str, List[Dict[str, Any]]] = field(default_factory=dict)         # DEPRECATED
+    key_concepts_per_subtopic: Dict[str, List[Dict[str, Any]]] = field(default_factory=dict)  # DEPRECATED
+    subtopic_hierarchies: Dict[str, List[Dict[str, Any]]] = field(default_factory=dict)      # DEPRECATED
+    cross_subtopic_links: List[Dict[str, Any]] = field(default_factory=list)               # DEPRECATED: Use concept_relationships instead
+    enriched_subtopics: Dict[str, Dict[str, Any]] = field(default_factory=dict)            # DEPRECATED: Use enriched_concepts instead
     
     # Metadata
-    processing_log: List[str]         # Step-by-step processing log
-    errors: List[str]                 # Any errors encountered
-    success: bool                     # Overall success status
-    timestamp: str                    # Processing timestamp
\ No newline at end of file
+    processing_log: Deque[str] = field(default_factory=lambda: deque(maxlen=PROCESSING_LOG_MAXLEN))  # Step-by-step processing log
+    errors: Deque[str] = field(default_factory=lambda: deque(maxlen=ERRORS_MAXLEN))                  # Any errors encountered
+    success: bool = True                                     # Overall success status
+    timestamp: str = ""                                      # Processing timestamp
+    
+    # Dict-style access for existing node code
+    def __getitem__(self, key: str) -> Any:
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+    
+    def __setitem__(self, key: str, value: Any) -> None:
+        try:
+            setattr(self, key, value)
+        except AttributeError:
+            raise KeyError(key) from None
+    
+    def get(self, key: str, default: Any = None) -> Any:
+        return getattr(self, key, default)
@@ -41,6 +41,7 @@ if not os.getenv('GOOGLE_API_KEY'):
 # Import required modules
 from concept_map_poc.timeline_mapper import create_timeline
 from concept_map_poc.precompute_engine import PrecomputeEngine
+from concept_map_poc.io_uring_writer import write_file
 import networkx as nx
 import matplotlib.pyplot as plt
 import matplotlib
@@ -110,8 +111,8 @@ def save_timeline_json_to_disk(timeline):
     filename = f"{sanitized_topic}_{timestamp}.json"
     filepath = TIMELINE_EXPORT_DIR / filename
     try:
-        with open(filepath, "w", encoding="utf-8") as f:
-            json.dump(timeline, f, indent=2, ensure_ascii=False)
+        payload = json.dumps(timeline, indent=2, ensure_ascii=False).encode("utf-8")
+        write_file(filepath, payload)
         logger.info(f"💾 Timeline JSON saved to {filepath}")
         return filepath
     except Exception as exc:
@@ -319,6 +319,34 @@ def assign_concept_reveal_times(
     return concepts
 
 
+_extraction_model = None
+
+
+def _get_extraction_model():
+    """Get or create the model for full-description extraction (shared across calls)"""
+    global _extraction_model
+    if _extraction_model is None:
+        # Use the optimized gemini-2.5-flash-lite model with deterministic output
+        generation_config = genai.GenerationConfig(
+            temperature=0.0,  # Deterministic output for consistent results
+            top_p=0.95,
+            top_k=40,
+            max_output_tokens=2048,
+        )
+        
+        _extraction_model = genai.GenerativeModel(
+            'gemini-2.5-flash-lite',
+            generation_config=generation_config,
+            safety_settings={
+                HarmCategory.HARM_CATEGORY_HATE_SPEECH: HarmBlockThreshold.BLOCK_NONE,
+                HarmCategory.HARM_CATEGORY_HARASSMENT: HarmBlockThreshold.BLOCK_NONE,
+                HarmCategory.HARM_CATEGORY_SEXUALLY_EXPLICIT: HarmBlockThreshold.BLOCK_NONE,
+                HarmCategory.HARM_CATEGORY_DANGEROUS_CONTENT: HarmBlockThreshold.BLOCK_NONE,
+            }
+        )
+    return _extraction_model
+
+
 def extract_concepts_from_full_description(
     description: str,
     educational_level: str
@@ -375,24 +403,7 @@ def extract_concepts_from_full_description(
         'api_call_start': start_time
     }
     
-    # Use the optimized gemini-2.5-flash-lite model with deterministic output
-    generation_config = genai.GenerationConfig(
-        temperature=0.0,  # Deterministic output for consistent results
-        top_p=0.95,
-        top_k=40,
-        max_output_tokens=2048,
-    )
-    
-    model = genai.GenerativeModel(
-        'gemini-2.5-flash-lite',
-        generation_config=generation_config,
-        safety_settings={
-            HarmCategory.HARM_CATEGORY_HATE_SPEECH: HarmBlockThreshold.BLOCK_NONE,
-            HarmCategory.HARM_CATEGORY_HARASSMENT: HarmBlockThreshold.BLOCK_NONE,
-            HarmCategory.HARM_CATEGORY_SEXUALLY_EXPLICIT: HarmBlockThreshold.BLOCK_NONE,
-            HarmCategory.HARM_CATEGORY_DANGEROUS_CONTENT: HarmBlockThreshold.BLOCK_NONE,
-        }
-    )
+    model = _get_extraction_model()
     
     # Dynamic prompt based on description analysis (matching nodes.py approach)
     prompt = f"""Extract concepts and relationships from this description for {educational_level} level.
@@ -690,7 +701,7 @@ def print_timeline_summary(timeline: Dict):
     print(f"Timeline Summary: {metadata['topic_name']}")
     print(f"{'='*60}")
     print(f"Educational Level: {metadata['educational_level']}")
-    print(f"Total Sentences: {metadata['total_sentences']}")
+    print(f"Total Sentences: {len(timeline['sentences'])}")
     print(f"Total Concepts: {metadata['total_concepts']}")
     print(f"{'='*60}\n")
     
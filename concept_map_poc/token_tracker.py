@@ -10,12 +10,37 @@ from typing import Optional
 
 logger = logging.getLogger(__name__)
 
+try:
+    import tiktoken
+    TIKTOKEN_AVAILABLE = True
+except ImportError:
+    TIKTOKEN_AVAILABLE = False
+
+# Gemini's tokenizer is not available offline; cl100k_base is close enough for budgeting
+TIKTOKEN_ENCODING = "cl100k_base"
+
+_tokenizer = None
+_tokenizer_failed = False
+
+
+def _get_tokenizer():
+    """Load the tiktoken encoding once (its first load may fetch the BPE file)"""
+    global _tokenizer, _tokenizer_failed
+    if _tokenizer is None and TIKTOKEN_AVAILABLE and not _tokenizer_failed:
+        try:
+            _tokenizer = tiktoken.get_encoding(TIKTOKEN_ENCODING)
+        except Exception as e:
+            _tokenizer_failed = True
+            logger.warning(f"⚠️ tiktoken encoding unavailable, using word-count estimate: {e}")
+    return _tokenizer
+
 
 def estimate_tokens(text: str) -> int:
     """
-    Estimate token count for text (rough approximation)
+    Estimate token count for text
     
-    Rule of thumb:
+    Uses the tiktoken encoding when it is available (Rust-backed, no API call);
+    otherwise falls back to a rule of thumb:
     - English: ~1 token per 4 characters
     - Or ~0.75 tokens per word
     
@@ -28,6 +53,10 @@ def estimate_tokens(text: str) -> int:
     if not text:
         return 0
     
+    tokenizer = _get_tokenizer()
+    if tokenizer is not None:
+        return len(tokenizer.encode_ordinary(text))
+    
     # Count words as a more accurate estimate
     words = len(text.split())
     
@@ -38,14 +67,15 @@ def estimate_tokens(text: str) -> int:
     return max(estimated_tokens, 1)
 
 
-def log_token_usage(node_name: str, prompt: str, response: str) -> dict:
+def log_token_usage(node_name: str, prompt: str, response: str, tracker_key: Optional[str] = None) -> dict:
     """
-    Log token usage for a Gemini API call
+    Log token usage for a Gemini API call and record it in the global tracker
     
     Args:
         node_name (str): Name of the node making the call
         prompt (str): The prompt sent to Gemini
         response (str): The response from Gemini
+        tracker_key (str): Entry name in the tracker summary (defaults to node_name)
         
     Returns:
         dict: Token usage statistics
@@ -68,6 +98,8 @@ def log_token_usage(node_name: str, prompt: str, response: str) -> dict:
         f"(in: {input_tokens}, out: {output_tokens})"
     )
     
+    get_tracker().add_node(tracker_key or node_name, token_info)
+    
     return token_info
 
 